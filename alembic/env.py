@@ -1,5 +1,6 @@
 from logging.config import fileConfig
 from app.db.database import Base
+import app.db.models  # noqa: F401  autogenerate가 테이블을 볼 수 있도록 모델 등록
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 import os
@@ -32,7 +33,7 @@ load_dotenv()
 config = context.config
 
 # .env의 DATABASE_URL 가져와서 적용
-database_url = os.getenv("DATABASE_PUBLIC_URL")
+database_url = os.getenv("DATABASE_PUBLIC_URL") or os.getenv("DATABASE_URL")
 if database_url:
     config.set_main_option("sqlalchemy.url", database_url)
 
@@ -81,7 +82,10 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite(로컬/테스트)는 ALTER를 거의 지원하지 않으므로 autogenerate도 batch 연산으로
+            render_as_batch=connection.dialect.name == "sqlite",
         )
 
         with context.begin_transaction():
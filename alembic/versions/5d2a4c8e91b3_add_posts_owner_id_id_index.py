@@ -0,0 +1,54 @@
+"""add (owner_id, id desc) index on posts
+
+Revision ID: 5d2a4c8e91b3
+Revises: 8f7ecb9aa467
+Create Date: 2026-10-18 10:12:41.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a4c8e91b3'
+down_revision: Union[str, Sequence[str], None] = '8f7ecb9aa467'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        # 운영 중인 테이블을 잠그지 않도록 CONCURRENTLY로 생성 (트랜잭션 밖에서 실행해야 함)
+        with op.get_context().autocommit_block():
+            op.create_index(
+                'ix_posts_owner_id_id',
+                'posts',
+                ['owner_id', sa.text('id DESC')],
+                postgresql_include=['title'],
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+    else:
+        op.create_index(
+            'ix_posts_owner_id_id',
+            'posts',
+            ['owner_id', sa.text('id DESC')],
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.drop_index(
+                'ix_posts_owner_id_id',
+                table_name='posts',
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+    else:
+        op.drop_index('ix_posts_owner_id_id', table_name='posts', if_exists=True)
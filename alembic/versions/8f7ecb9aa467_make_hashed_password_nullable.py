@@ -1,7 +1,7 @@
 """make hashed_password nullable
 
 Revision ID: 8f7ecb9aa467
-Revises: 
+Revises: 1b6e0f3a7c25
 Create Date: 2025-08-18 21:26:17.074547
 
 """
@@ -13,26 +13,27 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision: str = '8f7ecb9aa467'
-down_revision: Union[str, Sequence[str], None] = None  # 🔑 나중에 이전 revision id 넣어야 함
+down_revision: Union[str, Sequence[str], None] = '1b6e0f3a7c25'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
 
+# SQLite는 ALTER COLUMN이 없으므로 batch 모드 (SQLite에서는 테이블을 새로 만들어 복사, Postgres에서는 그냥 ALTER)
 def upgrade() -> None:
     """Upgrade schema."""
-    op.alter_column(
-        'users',
-        'hashed_password',
-        existing_type=sa.VARCHAR(),
-        nullable=True
-    )
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column(
+            'hashed_password',
+            existing_type=sa.VARCHAR(),
+            nullable=True
+        )
 
 
 def downgrade() -> None:
     """Downgrade schema."""
-    op.alter_column(
-        'users',
-        'hashed_password',
-        existing_type=sa.VARCHAR(),
-        nullable=False
-    )
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column(
+            'hashed_password',
+            existing_type=sa.VARCHAR(),
+            nullable=False
+        )
@@ -0,0 +1,82 @@
+"""add full text search on posts (Postgres tsvector + GIN, SQLite FTS5)
+
+Revision ID: a3c91f7d2e60
+Revises: 5d2a4c8e91b3
+Create Date: 2026-10-18 14:03:27.514932
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c91f7d2e60'
+down_revision: Union[str, Sequence[str], None] = '5d2a4c8e91b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# app/db/post_search.py의 SEARCH_TS_CONFIG와 같아야 함 (한국어 형태소 사전이 없으므로 simple)
+TS_CONFIG = 'simple'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        # 제목(A)에 본문(B)보다 높은 가중치. 생성 컬럼이라 INSERT/UPDATE 때 Postgres가 알아서 유지
+        # (컬럼 추가 시 테이블을 한 번 다시 씀)
+        op.execute(
+            "ALTER TABLE posts ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            "GENERATED ALWAYS AS ("
+            f"setweight(to_tsvector('{TS_CONFIG}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{TS_CONFIG}', coalesce(content, '')), 'B')"
+            ") STORED"
+        )
+        # owner_id(정수)도 GIN 인덱스에 넣으려면 btree_gin이 필요
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+        # WHERE owner_id = ? AND search_vector @@ ? 를 인덱스 하나로 처리
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_posts_owner_id_search_vector "
+                "ON posts USING gin (owner_id, search_vector)"
+            )
+    else:
+        # 로컬/테스트용 SQLite: posts를 원본으로 하는 external content FTS5 테이블 + 동기화 트리거
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts "
+            "USING fts5(title, content, content='posts', content_rowid='id')"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN "
+            "INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN "
+            "INSERT INTO posts_fts(posts_fts, rowid, title, content) "
+            "VALUES ('delete', old.id, old.title, old.content); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE ON posts BEGIN "
+            "INSERT INTO posts_fts(posts_fts, rowid, title, content) "
+            "VALUES ('delete', old.id, old.title, old.content); "
+            "INSERT INTO posts_fts(rowid, title, content) VALUES (new.id, new.title, new.content); "
+            "END"
+        )
+        # 이미 있는 글 색인
+        op.execute("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_posts_owner_id_search_vector")
+        op.execute("ALTER TABLE posts DROP COLUMN IF EXISTS search_vector")
+        # btree_gin은 다른 곳에서 쓸 수 있으므로 남겨 둠
+    else:
+        for trigger in ('posts_fts_ai', 'posts_fts_ad', 'posts_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS posts_fts")
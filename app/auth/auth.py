@@ -5,51 +5,131 @@
 
 from dotenv import load_dotenv
 import os
-import jwt
+import time
+import uuid
 from datetime import datetime, timedelta
 from fastapi import HTTPException, status
-from app.redis import redis_client
+from app.redis.redis_client import redis, pipelined_reads
+from app.redis.user_cache import user_cache
+from app.auth.token_codec import access_codec, refresh_codec, InvalidToken, TokenExpired
+from app.auth.revocation_filter import revocation_filter
+from app.metrics.metrics import timed
 
 load_dotenv()  # 이거 꼭 해줘야 함
 
-SECRET_KEY = os.getenv("SECRET_KEY")  # 이건 .env에 설정하거나 Railway에 입력
-REFRESH_SECRET_KEY = os.getenv("REFRESH_SECRET_KEY")  
-ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 15  # 15분 유효
 REFRESH_TOKEN_EXPIRE_DAYS = 7
 
+# 폐기되지 않은 것으로 확인된 jti를 이 프로세스에서 기억하는 시간 (초)
+# 다른 워커에서 폐기된 토큰은 최대 이 시간만큼 늦게 반영됨
+REVOCATION_NEGATIVE_CACHE_SECONDS = float(os.getenv("REVOCATION_NEGATIVE_CACHE_SECONDS", "5"))
+REVOCATION_NEGATIVE_CACHE_SIZE = int(os.getenv("REVOCATION_NEGATIVE_CACHE_SIZE", "50000"))
+
+
+# 블랙리스트 키 (jti는 uuid4 hex 32자라 키 길이가 항상 같음)
+def blacklist_key(jti: str) -> str:
+    return f"bl:{jti}"
+
 
 # JWT 토큰 생성 함수
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.setdefault("jti", uuid.uuid4().hex)
+    encoded_jwt = access_codec.encode(to_encode)
     return encoded_jwt
 
 def create_refresh_token(data: dict):
     expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode = data.copy()
     to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, REFRESH_SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.setdefault("jti", uuid.uuid4().hex)
+    return refresh_codec.encode(to_encode)
 
 
-# JWT 토큰 검증 함수
-def verify_access_token(token: str):
+# JWT 토큰 검증 후 payload 반환
+@timed("jwt_decode")
+def decode_access_token(token: str) -> dict:
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-        return user_id
-    except jwt.ExpiredSignatureError:
+        return access_codec.decode(token)
+    except TokenExpired:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired")
-    except jwt.PyJWTError:
+    except InvalidToken:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    
 
- # 토큰이 블랙리스트에 있는지 확인
-async def is_token_blacklisted(token: str) -> bool:
-    value = await redis_client.get(token)
-    return value == b"blacklisted"  # Redis에서 가져온 값은 bytes일 수 있음
 
+# JWT 토큰 검증 함수
+def verify_access_token(token: str):
+    return decode_access_token(token)["sub"]
+
+
+# 폐기되지 않은 jti를 잠깐 기억해 두는 작은 캐시
+class NegativeCache:
+    def __init__(self, ttl_seconds: float, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: dict[str, float] = {}
+
+    def __contains__(self, jti: str) -> bool:
+        expires_at = self._entries.get(jti)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self._entries[jti]
+            return False
+        return True
+
+    def add(self, jti: str):
+        if len(self._entries) >= self.max_size:
+            # 가득 차면 가장 오래된 항목부터 버림 (dict는 삽입 순서 유지)
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[jti] = time.monotonic() + self.ttl_seconds
+
+    def discard(self, jti: str):
+        self._entries.pop(jti, None)
+
+
+not_revoked_cache = NegativeCache(REVOCATION_NEGATIVE_CACHE_SECONDS, REVOCATION_NEGATIVE_CACHE_SIZE)
+
+
+ # Redis에 물어봐야 하는 jti인지 (프로세스 안에서만 판단)
+def revocation_lookup_needed(jti: str | None) -> bool:
+    if not jti:
+        # jti 도입 전에 발급된 토큰은 폐기 대상이 아님
+        return False
+    # Bloom 필터에 없으면 확실히 폐기되지 않은 토큰 → Redis 왕복 생략
+    if not revocation_filter.might_be_revoked(jti):
+        return False
+    return jti not in not_revoked_cache
+
+
+def _record_not_revoked(jti: str):
+    if revocation_filter.ready:
+        revocation_filter.record_false_positive()
+    not_revoked_cache.add(jti)
+
+
+ # 토큰(jti)이 블랙리스트에 있는지 확인 - Redis 왕복 한 번
+@timed("revocation_check")
+async def is_token_blacklisted(jti: str | None) -> bool:
+    if not revocation_lookup_needed(jti):
+        return False
+    if await redis.exists(blacklist_key(jti)):
+        return True
+    _record_not_revoked(jti)
+    return False
+
+
+# 토큰 캐시 미스 경로: 폐기 확인과 사용자 캐시 읽기를 한 번의 Redis 왕복으로 → (폐기 여부, 사용자)
+# 폐기 확인이 필요 없으면 사용자 캐시만 읽음 (Redis가 안 되면 DB로 대체)
+@timed("revocation_check")
+async def check_token_and_load_user(jti: str | None, user_id: int, loader):
+    if not revocation_lookup_needed(jti):
+        return False, await user_cache.get_by_id(user_id, loader)
+    # 폐기 확인이 실패하면 RedisError를 그대로 올려서 503 (is_token_blacklisted와 같음)
+    revoked, data = await pipelined_reads(("exists", blacklist_key(jti)), user_cache.id_read_command(user_id))
+    if revoked:
+        return True, None
+    _record_not_revoked(jti)
+    return False, await user_cache.get_by_id_from(user_id, data, loader)
@@ -1,10 +1,60 @@
 # redis와 연결
-# 이 파일은 Redis 클라이언트를 설정하고 블랙리스트 기능을 구현합니다.
-# Redis는 토큰 블랙리스트를 관리하는 데 사용됩니다.
+# 이 파일은 토큰 블랙리스트(폐기) 기능을 구현합니다.
+# 토큰 전체가 아니라 jti만 짧은 키(bl:{jti})로 저장하고, 남은 유효 시간만큼만 보관합니다.
 
+import time
 from app.redis.redis_client import redis
+from app.auth.auth import blacklist_key, not_revoked_cache
+from app.auth.token_cache import token_cache
+from app.auth.token_codec import token_fingerprint
+from app.auth.revocation_filter import revocation_filter, REVOCATION_CHANNEL, REVOCATION_INDEX_KEY
 
-async def blacklist_token(token: str, expire_seconds: int):
-    # 토큰을 블랙리스트에 추가, expire_seconds 후 자동 삭제
-    await redis.set(token, "blacklisted", ex=expire_seconds)
+# 여러 jti를 한 번의 Redis 왕복으로 폐기 (로그아웃 시 액세스/리프레시 토큰을 함께)
+async def blacklist_tokens(entries: list[tuple[str, int]]):
+    # jti를 블랙리스트에 추가, expire_seconds 후 자동 삭제
+    entries = [(jti, expire_seconds) for jti, expire_seconds in entries if expire_seconds > 0]
+    if not entries:
+        return
+    # 블랙리스트 키 + 필터 스냅샷용 인덱스 + 다른 워커 알림을 한 번에 보냄
+    now = time.time()
+    async with redis.pipeline(transaction=True) as pipe:
+        for jti, expire_seconds in entries:
+            pipe.set(blacklist_key(jti), "1", ex=expire_seconds)
+            pipe.zadd(REVOCATION_INDEX_KEY, {jti: now + expire_seconds})
+            pipe.publish(REVOCATION_CHANNEL, jti)
+        await pipe.execute()
+    for jti, _ in entries:
+        revocation_filter.add(jti)
+        not_revoked_cache.discard(jti)
 
+
+# 한 번만 쓸 수 있게 폐기: 블랙리스트 키를 SET NX로 먼저 잡은 요청만 True
+# (같은 토큰으로 동시에 들어와도 하나만 통과) jti가 없는 예전 토큰은 토큰 지문(token_fingerprint)을 키로 씀
+# 토큰 문자열 그대로를 해시하면 서명 표기만 바꾼 같은 토큰(패딩 '=' 추가 등)이 다른 키가 되어 다시 통과함
+async def consume_token(token: str, payload: dict) -> bool:
+    jti = payload.get("jti") or "legacy-" + token_fingerprint(token)
+    expire_seconds = int(payload["exp"] - time.time()) + 1
+    if expire_seconds <= 0:
+        return False
+    if not await redis.set(blacklist_key(jti), "1", nx=True, ex=expire_seconds):
+        return False
+    token_cache.invalidate_token(token)
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.zadd(REVOCATION_INDEX_KEY, {jti: time.time() + expire_seconds})
+        pipe.publish(REVOCATION_CHANNEL, jti)
+        await pipe.execute()
+    revocation_filter.add(jti)
+    not_revoked_cache.discard(jti)
+    return True
+
+
+# 검증이 끝난 토큰의 payload로 폐기 (남은 수명만큼만 블랙리스트에 유지)
+async def revoke_tokens(tokens: list[tuple[str, dict]]):
+    entries = []
+    for token, payload in tokens:
+        token_cache.invalidate_token(token)
+        jti = payload.get("jti")
+        exp = payload.get("exp")
+        if jti and exp is not None:
+            entries.append((jti, int(exp - time.time()) + 1))
+    await blacklist_tokens(entries)
@@ -1,26 +1,22 @@
-import os
 from fastapi import Depends
-from app.auth.auth import verify_access_token
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials,OAuth2PasswordBearer
-from app.auth.auth import verify_access_token, is_token_blacklisted,create_access_token
-from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from app.auth.auth import decode_access_token, is_token_blacklisted,create_access_token,check_token_and_load_user
+from app.auth.token_codec import access_codec, InvalidToken
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.database import get_db
-import app.db.models as models
+from app.db.crud import get_user_by_id
+from app.db.schemas import UserSnapshot
+from app.auth.token_cache import token_cache
+from app.metrics.metrics import stage_timer
 from dotenv import load_dotenv
 from fastapi import Request, HTTPException, Depends, status
-from sqlalchemy.orm import Session
-from jose import jwt, JWTError
 from datetime import timedelta
 
 
 
 load_dotenv()  # 이거 꼭 해줘야 함
 
-SECRET_KEY = os.getenv("SECRET_KEY")  # 이건 .env에 설정하거나 Railway에 입력
-ALGORITHM = "HS256"
-
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
@@ -29,7 +25,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 # 만약 토큰이 블랙리스트에 있다면 예외를 발생시킵니다.
 from fastapi import Request
 
-def get_current_user(request: Request, db: Session = Depends(get_db)):
+async def get_current_user(request: Request, db: AsyncSession = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="인증 실패",
@@ -50,18 +46,32 @@ def get_current_user(request: Request, db: Session = Depends(get_db)):
     if not token:
         raise credentials_exception
 
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
+    # 이미 검증한 토큰이면 서명 검증과 DB 조회를 건너뜀
+    cached = token_cache.get(token)
+    if cached is not None:
+        payload, snapshot = cached
+        if await is_token_blacklisted(payload.get("jti")):
+            token_cache.invalidate_token(token)
             raise credentials_exception
-    except JWTError:
+        return snapshot
+
+    try:
+        with stage_timer("jwt_decode"):
+            payload = access_codec.decode(token)
+        user_id: str = payload["sub"]
+    except InvalidToken:
         raise credentials_exception
-    
-    user = db.query(models.User).filter(models.User.id == int(user_id)).first()
-    if user is None:
+
+    # 폐기 확인 + 공유 사용자 캐시를 한 번의 Redis 왕복으로 (캐시에 없을 때만 DB 조회)
+    revoked, user = await check_token_and_load_user(
+        payload.get("jti"), int(user_id), lambda: get_user_by_id(db, int(user_id))
+    )
+    if revoked or user is None:
         raise credentials_exception
-    return user
+
+    snapshot = UserSnapshot(id=user.id, email=user.email, name=user.name)
+    token_cache.set(token, payload, snapshot)
+    return snapshot
 
 
 
@@ -75,8 +85,9 @@ security = HTTPBearer()
 async def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
 
-    if await is_token_blacklisted(token):
+    # 서명/만료는 로컬에서 먼저 확인하고, 폐기 여부만 Redis에 한 번 물어봄
+    payload = decode_access_token(token)
+    if await is_token_blacklisted(payload.get("jti")):
         raise HTTPException(status_code=401, detail="로그아웃된 토큰입니다.")
 
-    user_id = verify_access_token(token)
-    return user_id
\ No newline at end of file
+    return payload["sub"]
\ No newline at end of file
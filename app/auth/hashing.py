@@ -0,0 +1,183 @@
+# 비밀번호 해시/검증을 이벤트 루프 밖의 워커 풀에서 실행하는 모듈입니다.
+# bcrypt 한 번이 수백 ms 걸리기 때문에 async 핸들러에서 직접 부르면 워커 전체가 멈춥니다.
+# 동시에 실행되는 해시 수를 제한하고, 나머지는 대기열에 쌓아 둡니다.
+
+import asyncio
+import logging
+import os
+import secrets
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from app.db import crud
+from app.db.database import SessionLocal
+from app.metrics.metrics import STAGE_LATENCY
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# "thread" 또는 "process"
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+# 동시에 돌릴 수 있는 해시 수 (기본값은 워커 수와 같음)
+PASSWORD_HASH_MAX_CONCURRENCY = int(
+    os.getenv("PASSWORD_HASH_MAX_CONCURRENCY", str(PASSWORD_HASH_WORKERS))
+)
+
+
+class PasswordHasher:
+    def __init__(self, executor_kind: str, workers: int, max_concurrency: int):
+        self.executor_kind = executor_kind
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self._executor: Executor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        # 해시 정책 설정 (프로세스 풀 워커에 넘김, None이면 crud 기본값)
+        self.context_settings: dict | None = None
+        # 없는 계정 로그인에 쓰는 현재 정책의 더미 해시
+        self.dummy_hash: str | None = None
+        self.dummy_verifications = 0
+        # 진행 중인 재해시 (같은 사용자는 한 번만, 태스크가 GC되지 않게 참조 유지)
+        self._rehashing: dict[int, asyncio.Task] = {}
+        self.rehashed = 0
+
+        # 풀 크기를 정할 때 참고하는 카운터
+        self.queued = 0  # 슬롯을 기다리는 요청 수
+        self.in_flight = 0  # 지금 풀에서 실행 중인 해시 수
+        self.completed = 0
+        self.failed = 0
+        self.total_wait_seconds = 0.0
+        self.total_hash_seconds = 0.0
+        self.max_hash_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                # 워커 프로세스는 이 프로세스에서 정한 정책(측정한 bcrypt cost 등)을 모르므로 시작할 때 전달
+                initializer = crud.configure_pwd_context if self.context_settings else None
+                initargs = (self.context_settings,) if self.context_settings else ()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=initializer, initargs=initargs
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # 세마포어는 이벤트 루프 안에서 만들어야 해서 처음 사용할 때 생성
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _run(self, stage: str, func, *args):
+        semaphore = self._get_semaphore()
+        loop = asyncio.get_running_loop()
+
+        self.queued += 1
+        wait_started = time.perf_counter()
+        try:
+            await semaphore.acquire()
+        finally:
+            self.queued -= 1
+        waited = time.perf_counter() - wait_started
+        self.total_wait_seconds += waited
+        STAGE_LATENCY.labels(f"{stage}_queue").observe(waited)
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            result = await loop.run_in_executor(self._get_executor(), func, *args)
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.in_flight -= 1
+            semaphore.release()
+            self.total_hash_seconds += elapsed
+            self.max_hash_seconds = max(self.max_hash_seconds, elapsed)
+            STAGE_LATENCY.labels(stage).observe(elapsed)
+        self.completed += 1
+        return result
+
+    # 비밀번호 해시 (crud.get_password_hash를 풀에서 실행)
+    async def hash(self, password: str) -> str:
+        return await self._run("password_hash", crud.get_password_hash, password)
+
+    # 비밀번호 검증 (crud.verify_password를 풀에서 실행)
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run("password_verify", crud.verify_password, plain_password, hashed_password)
+
+    # 비밀번호가 없는 계정(가입 안 된 이메일, OAuth 전용 계정)도 실제 검증과 같은 비용을 쓰게 함
+    # 바로 실패하면 응답 시간으로 계정 존재 여부가 드러나고, 공격 트래픽의 비용도 예측하기 어려워짐
+    async def verify_or_dummy(self, plain_password: str, hashed_password: str | None) -> bool:
+        if hashed_password:
+            return await self.verify(plain_password, hashed_password)
+        if self.dummy_hash is None:
+            # 정책 적용 전에 불린 경우 (보통은 시작할 때 apply_password_policy가 채움)
+            self.dummy_hash = await self._run("password_hash", crud.get_password_hash, secrets.token_hex(16))
+        self.dummy_verifications += 1
+        await self._run("password_verify", crud.verify_password, plain_password, self.dummy_hash)
+        return False
+
+    # 해시 정책 적용 (이미 만든 풀은 새 설정으로 다시 만들도록 정리)
+    def configure(self, context_settings: dict, dummy_hash: str):
+        self.context_settings = context_settings
+        self.dummy_hash = dummy_hash
+        self.shutdown()
+
+    def needs_update(self, hashed_password: str | None) -> bool:
+        return bool(hashed_password) and crud.password_needs_update(hashed_password)
+
+    # 로그인 성공 후 예전 정책의 해시를 새 정책으로 다시 해시 (응답은 기다리지 않음)
+    def schedule_rehash(self, user, password: str):
+        if user.id in self._rehashing:
+            return
+        task = asyncio.create_task(self._rehash(user, password))
+        self._rehashing[user.id] = task
+        task.add_done_callback(lambda _: self._rehashing.pop(user.id, None))
+
+    async def _rehash(self, user, password: str):
+        try:
+            new_hash = await self._run("password_rehash", crud.get_password_hash, password)
+            async with SessionLocal() as db:
+                if await crud.update_password_hash(db, user, user.hashed_password, new_hash):
+                    self.rehashed += 1
+        except Exception:
+            # 실패해도 다음 로그인 때 다시 시도됨
+            logger.warning("password rehash failed for user %s", user.id, exc_info=True)
+
+    def stats(self) -> dict:
+        finished = self.completed + self.failed
+        return {
+            "executor": self.executor_kind,
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": self.queued,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_ms": (self.total_wait_seconds / finished * 1000) if finished else 0.0,
+            "avg_hash_ms": (self.total_hash_seconds / finished * 1000) if finished else 0.0,
+            "max_hash_ms": self.max_hash_seconds * 1000,
+            "scheme": crud.pwd_context.default_scheme(),
+            "bcrypt_rounds": (self.context_settings or {}).get("bcrypt__default_rounds"),
+            "rehash_pending": len(self._rehashing),
+            "rehashed": self.rehashed,
+            "dummy_verifications": self.dummy_verifications,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_CONCURRENCY
+)
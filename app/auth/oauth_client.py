@@ -0,0 +1,96 @@
+# 카카오/구글 OAuth 콜백에서 사용하는 공용 비동기 HTTP 클라이언트입니다.
+# 처음 사용할 때 한 번 만들고 앱 종료 시 닫아서 TLS 연결을 재사용(keep-alive, HTTP/2)합니다.
+# 프로바이더 주소는 환경변수로 바꿀 수 있어서 로컬 스텁 OAuth 서버를 대상으로 테스트할 수 있습니다.
+# httpx/h2는 소셜 로그인에서만 필요하므로 첫 요청 때 import 합니다 (앱 시작 시간 단축).
+
+import os
+
+from dotenv import load_dotenv
+
+from app.metrics.metrics import stage_timer
+
+load_dotenv()
+
+OAUTH_MAX_CONNECTIONS = int(os.getenv("OAUTH_MAX_CONNECTIONS", "100"))
+OAUTH_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OAUTH_MAX_KEEPALIVE_CONNECTIONS", "20"))
+OAUTH_KEEPALIVE_EXPIRY = float(os.getenv("OAUTH_KEEPALIVE_EXPIRY", "30"))
+OAUTH_HTTP2 = os.getenv("OAUTH_HTTP2", "true").lower() == "true"
+
+# 프로바이더별 엔드포인트 (스텁 서버로 바꿔 끼울 수 있음)
+KAKAO_TOKEN_URL = os.getenv("KAKAO_TOKEN_URL", "https://kauth.kakao.com/oauth/token")
+KAKAO_USERINFO_URL = os.getenv("KAKAO_USERINFO_URL", "https://kapi.kakao.com/v2/user/me")
+GOOGLE_TOKEN_URL = os.getenv("GOOGLE_TOKEN_URL", "https://oauth2.googleapis.com/token")
+GOOGLE_USERINFO_URL = os.getenv("GOOGLE_USERINFO_URL", "https://www.googleapis.com/oauth2/v2/userinfo")
+
+
+def _provider_timeout(provider: str, default: float) -> tuple[float, float]:
+    prefix = provider.upper()
+    total = float(os.getenv(f"{prefix}_HTTP_TIMEOUT", str(default)))
+    connect = float(os.getenv(f"{prefix}_HTTP_CONNECT_TIMEOUT", str(min(total, 3.0))))
+    return total, connect
+
+
+# 프로바이더별 타임아웃 (전체, 연결)
+PROVIDER_TIMEOUTS = {
+    "kakao": _provider_timeout("kakao", 5.0),
+    "google": _provider_timeout("google", 5.0),
+}
+
+_client = None
+
+
+# 프로바이더 서버에 연결할 수 없거나 시간 초과
+class OAuthProviderUnavailable(Exception):
+    pass
+
+
+# 처음 사용할 때 생성 (transport는 테스트에서 스텁 서버를 끼울 때 사용)
+def start_http_client(transport=None):
+    global _client
+    if _client is not None:
+        return _client
+    import httpx
+
+    _client = httpx.AsyncClient(
+        http2=OAUTH_HTTP2 and transport is None,
+        limits=httpx.Limits(
+            max_connections=OAUTH_MAX_CONNECTIONS,
+            max_keepalive_connections=OAUTH_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=OAUTH_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(5.0),
+        transport=transport,
+    )
+    return _client
+
+
+# 앱 종료 시 호출
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_http_client():
+    return _client if _client is not None else start_http_client()
+
+
+async def _request(provider: str, method: str, url: str, **kwargs):
+    import httpx
+
+    client = get_http_client()
+    total, connect = PROVIDER_TIMEOUTS[provider]
+    try:
+        with stage_timer(f"oauth_{provider}"):
+            return await client.request(method, url, timeout=httpx.Timeout(total, connect=connect), **kwargs)
+    except httpx.TransportError as exc:
+        raise OAuthProviderUnavailable(provider) from exc
+
+
+async def provider_post(provider: str, url: str, **kwargs):
+    return await _request(provider, "POST", url, **kwargs)
+
+
+async def provider_get(provider: str, url: str, **kwargs):
+    return await _request(provider, "GET", url, **kwargs)
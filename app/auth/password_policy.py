@@ -0,0 +1,84 @@
+# 비밀번호 해시 정책 (알고리즘과 비용)
+# 로그인 한 번에 쓰는 CPU 시간을 서버 사양에 맞게 조절하기 위한 모듈입니다.
+#   - bcrypt: BCRYPT_ROUNDS=auto면 시작할 때 PASSWORD_HASH_TARGET_MS에 맞는 cost를 측정해서 정함
+#   - argon2: argon2id의 time/memory/parallelism을 환경변수로 지정 (argon2-cffi 필요)
+# 정책이 바뀌면 기존 해시는 다음 로그인 때 needs_update로 감지해서 백그라운드에서 다시 해시합니다.
+# (비밀번호 재설정 없이 비용을 올리거나 내릴 수 있음)
+
+import asyncio
+import os
+import secrets
+import time
+
+from dotenv import load_dotenv
+from passlib.hash import bcrypt
+
+from app.db import crud
+from app.auth.hashing import password_hasher
+
+load_dotenv()
+
+# "bcrypt" 또는 "argon2" (새로 만드는 해시에 쓸 알고리즘, 나머지는 검증만 하고 재해시 대상)
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")
+# 숫자 또는 "auto" (auto면 시작할 때 측정)
+BCRYPT_ROUNDS = os.getenv("BCRYPT_ROUNDS", "12")
+# auto 측정 시 해시 한 번의 목표 시간 (ms)
+PASSWORD_HASH_TARGET_MS = float(os.getenv("PASSWORD_HASH_TARGET_MS", "250"))
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "19456"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+
+
+# bcrypt는 cost가 1 오를 때마다 시간이 두 배이므로, 낮은 cost로 재고 목표 시간에 맞는 cost를 계산
+def calibrate_bcrypt_rounds(target_ms: float, samples: int = 3) -> int:
+    elapsed = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        bcrypt.using(rounds=BCRYPT_MIN_ROUNDS).hash("calibration")
+        elapsed.append((time.perf_counter() - started) * 1000)
+    # 가장 빠른 값 기준 (다른 작업에 밀린 측정치는 버림)
+    cost_ms = min(elapsed)
+    rounds = BCRYPT_MIN_ROUNDS
+    while rounds < BCRYPT_MAX_ROUNDS and cost_ms * 2 <= target_ms:
+        cost_ms *= 2
+        rounds += 1
+    return rounds
+
+
+# CryptContext(**settings)에 그대로 넘기는 설정 (프로세스 풀 워커에도 그대로 전달)
+def context_settings(bcrypt_rounds: int, fixed_rounds: bool) -> dict:
+    default = "argon2" if PASSWORD_HASH_SCHEME == "argon2" else "bcrypt"
+    settings = {
+        "schemes": [default] + [s for s in ("bcrypt", "argon2") if s != default],
+        "default": default,
+        # 기본 알고리즘이 아닌 해시는 needs_update = True
+        "deprecated": "auto",
+        "bcrypt__default_rounds": bcrypt_rounds,
+        # 이보다 약한 해시는 다시 해시
+        "bcrypt__min_rounds": bcrypt_rounds,
+        "argon2__type": "ID",
+        "argon2__rounds": ARGON2_TIME_COST,
+        "argon2__memory_cost": ARGON2_MEMORY_COST,
+        "argon2__parallelism": ARGON2_PARALLELISM,
+    }
+    if fixed_rounds:
+        # 값을 직접 정한 경우에만 더 비싼 해시도 낮춤
+        # (auto는 워커마다 측정값이 조금씩 달라서 해시가 왔다 갔다 하지 않게 올리기만 함)
+        settings["bcrypt__max_rounds"] = bcrypt_rounds
+    return settings
+
+
+# 앱 시작 시 호출: 정책을 정해서 이벤트 루프의 crud 컨텍스트와 해시 풀에 적용
+async def apply_password_policy() -> dict:
+    if BCRYPT_ROUNDS == "auto":
+        rounds = await asyncio.to_thread(calibrate_bcrypt_rounds, PASSWORD_HASH_TARGET_MS)
+        settings = context_settings(rounds, fixed_rounds=False)
+    else:
+        settings = context_settings(int(BCRYPT_ROUNDS), fixed_rounds=True)
+    crud.configure_pwd_context(settings)
+    # 없는 계정 로그인도 같은 비용으로 검증하도록 현재 정책으로 더미 해시를 만들어 둠
+    dummy_hash = await asyncio.to_thread(crud.get_password_hash, secrets.token_hex(16))
+    password_hasher.configure(settings, dummy_hash)
+    return settings
@@ -0,0 +1,161 @@
+# 로그인/회원가입/리프레시 요청 제한 (IP별, 이메일별)
+# GCRA(Generic Cell Rate Algorithm)를 Redis Lua 스크립트 하나로 원자적으로 검사합니다.
+# 제한에 걸린 요청은 라우터 핸들러(= bcrypt 검증)까지 가지 않고 429 + Retry-After로 끝납니다.
+# Redis가 안 될 때는 프로세스 메모리의 같은 알고리즘으로 대신 제한합니다.
+
+import hashlib
+import math
+import os
+import time
+
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request
+from redis.exceptions import RedisError
+
+from app.redis.redis_client import redis
+
+load_dotenv()
+
+# Railway 프록시 뒤에서는 X-Forwarded-For의 마지막 값(프록시가 붙인 실제 클라이언트 IP)을 사용
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "true").lower() == "true"
+RATE_LIMIT_LOCAL_MAX_KEYS = int(os.getenv("RATE_LIMIT_LOCAL_MAX_KEYS", "100000"))
+
+
+# "횟수/초" 형식 (예: "10/60" = 60초에 10번)
+def parse_rate(value: str) -> tuple[int, float]:
+    count, period = value.split("/")
+    return int(count), float(period)
+
+
+# KEYS = 제한 키들 / ARGV = (간격 ms, 허용 버스트 ms) 쌍
+# 모든 키가 통과할 때만 한꺼번에 기록하고, 하나라도 걸리면 가장 긴 대기 시간(ms)을 돌려줌
+_GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local retry_after = 0
+local new_tats = {}
+for i, key in ipairs(KEYS) do
+    local interval = tonumber(ARGV[2 * i - 1])
+    local tolerance = tonumber(ARGV[2 * i])
+    local tat = tonumber(redis.call('GET', key)) or now
+    if tat < now then
+        tat = now
+    end
+    local new_tat = tat + interval
+    local allow_at = new_tat - tolerance
+    if allow_at > now then
+        retry_after = math.max(retry_after, allow_at - now)
+    end
+    new_tats[i] = new_tat
+end
+if retry_after > 0 then
+    return retry_after
+end
+for i, key in ipairs(KEYS) do
+    redis.call('SET', key, new_tats[i], 'PX', new_tats[i] - now)
+end
+return 0
+"""
+
+_gcra = redis.register_script(_GCRA_SCRIPT)
+
+
+class LocalGCRA:
+    # Redis 장애 시 사용하는 프로세스 내 GCRA (워커마다 따로 세므로 실제 한도는 느슨해짐)
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._tats: dict[str, float] = {}
+
+    def check(self, limits: list[tuple[str, float, float]]) -> float:
+        now = time.monotonic() * 1000
+        retry_after = 0.0
+        new_tats = []
+        for key, interval, tolerance in limits:
+            tat = max(self._tats.get(key, now), now)
+            new_tat = tat + interval
+            retry_after = max(retry_after, new_tat - tolerance - now)
+            new_tats.append((key, new_tat))
+        if retry_after > 0:
+            return retry_after
+        if len(self._tats) >= self.max_keys:
+            # 이미 만료된 항목부터 정리
+            self._tats = {k: v for k, v in self._tats.items() if v > now}
+        for key, new_tat in new_tats:
+            self._tats[key] = new_tat
+        return 0.0
+
+
+local_limiter = LocalGCRA(RATE_LIMIT_LOCAL_MAX_KEYS)
+
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_PROXY:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.rsplit(",", 1)[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+class RateLimit:
+    # ip_rate / email_rate: "횟수/초", email_rate가 있으면 JSON 본문의 email로도 제한
+    def __init__(self, scope: str, ip_rate: str, email_rate: str | None = None):
+        self.scope = scope
+        self.ip_rate = parse_rate(ip_rate)
+        self.email_rate = parse_rate(email_rate) if email_rate else None
+
+    @staticmethod
+    def _gcra_params(rate: tuple[int, float]) -> tuple[float, float]:
+        count, period = rate
+        period_ms = period * 1000
+        # 간격 = 기간/횟수, 허용 버스트 = 기간 전체 (처음에 count번까지 한 번에 허용)
+        return period_ms / count, period_ms
+
+    async def _email(self, request: Request) -> str | None:
+        try:
+            # 본문은 Starlette가 캐시하므로 핸들러에서 다시 읽어도 문제 없음
+            body = await request.json()
+        except ValueError:
+            return None
+        email = body.get("email") if isinstance(body, dict) else None
+        return email.strip().lower() if isinstance(email, str) else None
+
+    async def __call__(self, request: Request):
+        limits = []
+        interval, tolerance = self._gcra_params(self.ip_rate)
+        limits.append((f"rl:{self.scope}:ip:{client_ip(request)}", interval, tolerance))
+
+        if self.email_rate is not None:
+            email = await self._email(request)
+            if email:
+                # 키 길이를 일정하게, 이메일 원문은 Redis에 남기지 않음
+                digest = hashlib.sha256(email.encode()).hexdigest()[:24]
+                interval, tolerance = self._gcra_params(self.email_rate)
+                limits.append((f"rl:{self.scope}:email:{digest}", interval, tolerance))
+
+        try:
+            args = []
+            for _, interval, tolerance in limits:
+                args += [math.ceil(interval), math.ceil(tolerance)]
+            retry_after_ms = float(await _gcra(keys=[key for key, _, _ in limits], args=args))
+        except (RedisError, OSError):
+            retry_after_ms = local_limiter.check(limits)
+
+        if retry_after_ms > 0:
+            raise HTTPException(
+                status_code=429,
+                detail="요청이 너무 많습니다. 잠시 후 다시 시도해 주세요.",
+                headers={"Retry-After": str(math.ceil(retry_after_ms / 1000))},
+            )
+
+
+login_rate_limit = RateLimit(
+    "login",
+    os.getenv("RATE_LIMIT_LOGIN_IP", "20/60"),
+    os.getenv("RATE_LIMIT_LOGIN_EMAIL", "5/60"),
+)
+register_rate_limit = RateLimit(
+    "register",
+    os.getenv("RATE_LIMIT_REGISTER_IP", "5/60"),
+    os.getenv("RATE_LIMIT_REGISTER_EMAIL", "3/60"),
+)
+refresh_rate_limit = RateLimit("refresh", os.getenv("RATE_LIMIT_REFRESH_IP", "30/60"))
@@ -0,0 +1,172 @@
+# 폐기된 토큰 jti를 담는 프로세스 내 Bloom 필터입니다.
+# 대부분의 토큰은 폐기된 적이 없으므로, 필터에 없다고 나오면 Redis에 묻지 않고 바로 통과시킵니다.
+# 필터에 있다고 나올 때(진짜 폐기 또는 false positive)만 Redis를 확인합니다.
+#
+# 워커 간 동기화:
+#   - 폐기 시 jti를 Redis 정렬 집합(bl:index, score=만료 시각)에 넣고 채널로 publish
+#   - 각 워커는 채널을 구독해서 필터에 추가하고, 주기적으로 정렬 집합에서 필터를 다시 만듦
+#   - 구독이 끊겼거나 아직 스냅샷을 못 읽었으면 필터를 믿지 않고 항상 Redis를 확인 (false negative 방지)
+
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import time
+
+from dotenv import load_dotenv
+from redis.exceptions import RedisError
+
+from app.redis.redis_client import redis
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REVOCATION_CHANNEL = "revoked-tokens"
+REVOCATION_INDEX_KEY = "bl:index"
+
+REVOCATION_FILTER_CAPACITY = int(os.getenv("REVOCATION_FILTER_CAPACITY", "100000"))
+REVOCATION_FILTER_FP_RATE = float(os.getenv("REVOCATION_FILTER_FP_RATE", "0.001"))
+REVOCATION_FILTER_MAX_BYTES = int(os.getenv("REVOCATION_FILTER_MAX_BYTES", str(1024 * 1024)))
+# 필터를 새로 만드는 주기 (기본은 액세스 토큰 수명 15분) - 만료된 jti가 이때 빠짐
+REVOCATION_FILTER_ROTATE_SECONDS = float(os.getenv("REVOCATION_FILTER_ROTATE_SECONDS", str(15 * 60)))
+REVOCATION_FILTER_RETRY_SECONDS = float(os.getenv("REVOCATION_FILTER_RETRY_SECONDS", "1"))
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, fp_rate: float, max_bytes: int):
+        # 최적 비트 수 m = -n ln p / (ln 2)^2, 메모리 예산을 넘지 않게 자름
+        bits = math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))
+        bits = max(8, min(bits, max_bytes * 8))
+        self.num_bits = bits
+        self.num_hashes = max(1, round(bits / capacity * math.log(2)))
+        self._bits = bytearray((bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        for pos in self._positions(item):
+            if not self._bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+
+class RevocationFilter:
+    def __init__(self, capacity: int, fp_rate: float, max_bytes: int):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.max_bytes = max_bytes
+        self._filter = BloomFilter(capacity, fp_rate, max_bytes)
+        self.ready = False  # 스냅샷 로드 + 구독이 모두 된 상태에서만 필터를 믿음
+        self._task: asyncio.Task | None = None
+        self.last_rebuild = 0.0
+
+        self.hits = 0  # 필터에 있다고 나와서 Redis를 확인한 횟수
+        self.misses = 0  # 필터 덕분에 Redis를 건너뛴 횟수
+        self.bypassed = 0  # 필터가 준비되지 않아 Redis로 간 횟수
+        self.false_positives = 0
+
+    # False면 확실히 폐기되지 않은 토큰
+    def might_be_revoked(self, jti: str) -> bool:
+        if not self.ready:
+            self.bypassed += 1
+            return True
+        if jti in self._filter:
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def add(self, jti: str):
+        self._filter.add(jti)
+
+    def record_false_positive(self):
+        self.false_positives += 1
+
+    # Redis 정렬 집합에서 아직 만료되지 않은 jti로 필터를 새로 만듦
+    async def rebuild(self):
+        now = time.time()
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(REVOCATION_INDEX_KEY, "-inf", now)
+            pipe.zrangebyscore(REVOCATION_INDEX_KEY, now, "+inf")
+            _, jtis = await pipe.execute()
+        new_filter = BloomFilter(self.capacity, self.fp_rate, self.max_bytes)
+        for jti in jtis:
+            new_filter.add(jti)
+        self._filter = new_filter
+        self.last_rebuild = time.monotonic()
+
+    async def _run(self):
+        while True:
+            pubsub = redis.pubsub()
+            try:
+                # 먼저 구독하고 나서 스냅샷을 읽어야 그 사이 폐기된 jti를 놓치지 않음
+                await pubsub.subscribe(REVOCATION_CHANNEL)
+                await self.rebuild()
+                self.ready = True
+                while True:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message is not None and message["type"] == "message":
+                        self._filter.add(message["data"])
+                    if time.monotonic() - self.last_rebuild >= REVOCATION_FILTER_ROTATE_SECONDS:
+                        await self.rebuild()
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, OSError):
+                logger.warning("revocation filter sync lost, falling back to Redis lookups", exc_info=True)
+            finally:
+                self.ready = False
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(REVOCATION_FILTER_RETRY_SECONDS)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        checked = self.hits + self.misses
+        return {
+            "ready": self.ready,
+            "entries": self._filter.count,
+            "size_bytes": self._filter.size_bytes,
+            "num_hashes": self._filter.num_hashes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "false_positives": self.false_positives,
+            "hit_ratio": (self.hits / checked) if checked else 0.0,
+            "miss_ratio": (self.misses / checked) if checked else 0.0,
+        }
+
+
+revocation_filter = RevocationFilter(
+    REVOCATION_FILTER_CAPACITY, REVOCATION_FILTER_FP_RATE, REVOCATION_FILTER_MAX_BYTES
+)
@@ -0,0 +1,103 @@
+# 검증이 끝난 액세스 토큰을 프로세스 메모리에 보관하는 LRU/TTL 캐시입니다.
+# 같은 토큰으로 다시 요청하면 JWT 서명 검증과 사용자 조회 쿼리를 모두 건너뜁니다.
+# 각 항목은 토큰의 exp보다 늦게 남아 있지 않습니다.
+
+import os
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+from app.db.schemas import UserSnapshot
+
+load_dotenv()
+
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "10000"))
+TOKEN_CACHE_TTL_SECONDS = float(os.getenv("TOKEN_CACHE_TTL_SECONDS", "60"))
+
+
+def _cache_key(token: str) -> str:
+    # 서명 부분만 키로 사용 (짧고, 토큰마다 유일함)
+    return token.rpartition(".")[2]
+
+
+class TokenCache:
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        # key -> (만료 시각, 원본 토큰, claims, 사용자 스냅샷)
+        self._entries: OrderedDict[str, tuple[float, str, dict, UserSnapshot]] = OrderedDict()
+        # user_id -> 해당 사용자의 캐시 키들 (사용자 정보가 바뀌면 한 번에 지우기 위함)
+        self._keys_by_user: dict[int, set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> tuple[dict, UserSnapshot] | None:
+        key = _cache_key(token)
+        entry = self._entries.get(key)
+        # 서명만 같고 payload를 바꾼 토큰이 캐시를 타지 않도록 원본 토큰까지 비교
+        if entry is None or entry[1] != token:
+            self.misses += 1
+            return None
+        if entry[0] <= time.time():
+            self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2], entry[3]
+
+    def set(self, token: str, claims: dict, user: UserSnapshot):
+        expires_at = time.time() + self.ttl_seconds
+        exp = claims.get("exp")
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        if expires_at <= time.time():
+            return
+
+        key = _cache_key(token)
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (expires_at, token, claims, user)
+        self._keys_by_user.setdefault(user.id, set()).add(key)
+
+        while len(self._entries) > self.max_size:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    # 토큰이 폐기(로그아웃 등)되었을 때
+    def invalidate_token(self, token: str):
+        key = _cache_key(token)
+        if key in self._entries:
+            self._remove(key)
+
+    # 사용자 정보가 바뀌었을 때 해당 사용자의 모든 항목 제거
+    def invalidate_user(self, user_id: int):
+        for key in self._keys_by_user.pop(user_id, set()):
+            self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._keys_by_user.clear()
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry[3].id
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+token_cache = TokenCache(TOKEN_CACHE_MAX_SIZE, TOKEN_CACHE_TTL_SECONDS)
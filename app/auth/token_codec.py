@@ -0,0 +1,259 @@
+# JWT 인코딩/디코딩을 한 곳에서 담당하는 모듈입니다.
+# 키, 알고리즘, 클레임 검증을 여기서만 다루고, 다른 모듈은 access_codec / refresh_codec만 사용합니다.
+#
+# HS256 같은 HMAC 토큰은 PyJWT를 거치지 않는 빠른 경로로 처리합니다.
+#   - HMAC 키 상태는 한 번만 준비해 두고 요청마다 copy()만 함
+#   - 헤더는 거의 항상 같으므로 디코딩한 헤더를 캐시
+# 그 밖의 알고리즘(EdDSA, ES256 등)은 kid별로 미리 준비한 키 객체로 PyJWT에 넘깁니다.
+#
+# 비대칭 모드 (JWT_KEYS 설정 시):
+#   액세스 토큰을 Ed25519/ES256 개인키로 kid와 함께 서명하고, 공개키는 /.well-known/jwks.json으로 공개합니다.
+#   다른 서비스/게이트웨이는 SECRET_KEY 없이 JWKS만으로 토큰을 검증할 수 있습니다.
+#   JWT_KEYS = {"kid": "PEM", ...} (개인키 PEM이면 서명 가능, 공개키 PEM이면 검증만)
+#   JWT_SIGNING_KID = 서명에 사용할 kid
+#
+# 무중단 키 교체 순서:
+#   1. 새 키를 JWT_KEYS에 추가해서 배포 (JWKS에 먼저 공개, 서명은 아직 예전 키)
+#   2. JWKS 캐시 시간이 지난 뒤 JWT_SIGNING_KID를 새 kid로 바꿔서 배포
+#   3. 액세스 토큰 수명(15분) + JWKS 캐시 시간이 지난 뒤 예전 키를 JWT_KEYS에서 제거
+
+import base64
+import calendar
+import hashlib
+import hmac
+import json
+import os
+import time
+
+from dotenv import load_dotenv
+from jwt.algorithms import get_default_algorithms
+
+load_dotenv()
+
+SECRET_KEY = os.getenv("SECRET_KEY")  # 이건 .env에 설정하거나 Railway에 입력
+REFRESH_SECRET_KEY = os.getenv("REFRESH_SECRET_KEY")
+ALGORITHM = "HS256"
+JWT_KEYS = os.getenv("JWT_KEYS")
+JWT_SIGNING_KID = os.getenv("JWT_SIGNING_KID")
+# 서버 간 시계 차이 허용 (초)
+JWT_LEEWAY_SECONDS = int(os.getenv("JWT_LEEWAY_SECONDS", "0"))
+
+_HMAC_DIGESTS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+
+class InvalidToken(Exception):
+    pass
+
+
+class TokenExpired(InvalidToken):
+    pass
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _json_dumps(data: dict) -> bytes:
+    return json.dumps(data, separators=(",", ":"), default=str).encode()
+
+
+# 토큰 문자열 표기와 무관한 식별자: sha256(header.payload + 디코딩한 서명 바이트)
+# (서명의 base64 표기를 바꿔도 같은 값이 나오므로 jti가 없는 토큰을 한 번만 쓰게 할 때 사용)
+def token_fingerprint(token: str) -> str:
+    signing_input, _, signature_b64 = token.rpartition(".")
+    try:
+        signature = _b64decode(signature_b64)
+    except (ValueError, TypeError):
+        raise InvalidToken("malformed signature")
+    return hashlib.sha256(signing_input.encode() + b"." + signature).hexdigest()
+
+
+class TokenCodec:
+    # signing_kid: 서명할 때 헤더에 넣을 kid (HMAC 단일 키면 None)
+    # keys: kid -> (알고리즘, 서명 키, 검증 키)
+    # 내부적으로는 kid -> (알고리즘, 준비된 서명 키, 준비된 검증 키, PyJWT 알고리즘 객체)로 보관
+    def __init__(self, keys: dict, signing_kid, required_claims=("exp", "sub")):
+        self.required_claims = tuple(required_claims)
+        self._keys = {}
+        self._headers = {}  # 인코딩된 헤더 문자열 -> (alg, kid)
+        for kid, (algorithm, signing_key, verify_key) in keys.items():
+            self.add_key(kid, algorithm, signing_key, verify_key)
+        self.use_signing_key(signing_kid)
+
+    @classmethod
+    def from_secret(cls, secret: str | bytes, algorithm: str = ALGORITHM) -> "TokenCodec":
+        return cls({None: (algorithm, secret, secret)}, None)
+
+    def add_key(self, kid, algorithm: str, signing_key, verify_key):
+        if algorithm in _HMAC_DIGESTS:
+            secret = signing_key.encode() if isinstance(signing_key, str) else signing_key
+            prepared = hmac.new(secret, digestmod=_HMAC_DIGESTS[algorithm])
+            self._keys[kid] = (algorithm, prepared, prepared, None)
+        else:
+            # PEM 등은 여기서 한 번만 파싱
+            algo = get_default_algorithms()[algorithm]
+            signing = algo.prepare_key(signing_key) if signing_key is not None else None
+            verifying = algo.prepare_key(verify_key)
+            self._keys[kid] = (algorithm, signing, verifying, algo)
+
+    # 공개 JWK 목록 (HMAC 키는 비밀이므로 제외)
+    def jwks(self) -> dict:
+        keys = []
+        for kid, (algorithm, _, verifying, algo) in self._keys.items():
+            if algo is None or kid is None:
+                continue
+            jwk = algo.to_jwk(verifying, as_dict=True)
+            jwk.update({"kid": kid, "alg": algorithm, "use": "sig"})
+            keys.append(jwk)
+        return {"keys": keys}
+
+    def remove_key(self, kid):
+        self._keys.pop(kid, None)
+        self._headers = {h: v for h, v in self._headers.items() if v[1] != kid}
+
+    def use_signing_key(self, kid):
+        algorithm, signing, _, _ = self._keys[kid]
+        if signing is None:
+            raise ValueError(f"key {kid!r} has no private part")
+        header = {"alg": algorithm, "typ": "JWT"}
+        if kid is not None:
+            header["kid"] = kid
+        self.signing_kid = kid
+        self.algorithm = algorithm
+        self._signing_header = _b64encode(_json_dumps(header))
+        self._headers[self._signing_header] = (algorithm, kid)
+
+    def encode(self, claims: dict) -> str:
+        claims = dict(claims)
+        for name in ("exp", "iat", "nbf"):
+            value = claims.get(name)
+            if hasattr(value, "utctimetuple"):
+                # datetime.utcnow() 같은 naive datetime은 UTC로 취급 (PyJWT와 동일)
+                claims[name] = calendar.timegm(value.utctimetuple())
+        signing_input = f"{self._signing_header}.{_b64encode(_json_dumps(claims))}"
+        algorithm, signing, _, algo = self._keys[self.signing_kid]
+        if algo is None:
+            mac = signing.copy()
+            mac.update(signing_input.encode())
+            signature = mac.digest()
+        else:
+            signature = algo.sign(signing_input.encode(), signing)
+        return f"{signing_input}.{_b64encode(signature)}"
+
+    def _parse_header(self, header_b64: str) -> tuple[str, object]:
+        cached = self._headers.get(header_b64)
+        if cached is not None:
+            return cached
+        try:
+            header = json.loads(_b64decode(header_b64))
+        except ValueError:
+            raise InvalidToken("malformed header")
+        if not isinstance(header, dict):
+            raise InvalidToken("malformed header")
+        parsed = (header.get("alg"), header.get("kid"))
+        # kid가 리스트/객체면 dict 조회에서 TypeError가 나므로 여기서 거부
+        if not isinstance(parsed[0], str) or not isinstance(parsed[1], (str, type(None))):
+            raise InvalidToken("malformed header")
+        # 알려진 키에 대한 헤더만 캐시 (임의 헤더로 캐시가 커지지 않게)
+        if parsed[1] in self._keys and len(self._headers) < 64:
+            self._headers[header_b64] = parsed
+        return parsed
+
+    def decode(self, token: str) -> dict:
+        try:
+            header_b64, payload_b64, signature_b64 = token.split(".")
+        except (AttributeError, ValueError):
+            raise InvalidToken("malformed token")
+
+        algorithm, kid = self._parse_header(header_b64)
+        key = self._keys.get(kid)
+        # 헤더의 alg가 키에 등록된 알고리즘과 다르면 거부 (alg 바꿔치기 방지)
+        if key is None or key[0] != algorithm:
+            raise InvalidToken("unknown key or algorithm")
+
+        try:
+            signature = _b64decode(signature_b64)
+        except (ValueError, TypeError):
+            raise InvalidToken("malformed signature")
+        # b64 디코딩은 '=' 패딩이나 알파벳 밖 문자를 버리므로 같은 서명이 여러 문자열로 통과할 수 있음
+        # → 정규 인코딩만 받아서 토큰 문자열 자체를 토큰 캐시 키로 쓸 수 있게 함 (한 번만 쓰는 키는 token_fingerprint)
+        if _b64encode(signature) != signature_b64:
+            raise InvalidToken("non-canonical signature")
+        signing_input = f"{header_b64}.{payload_b64}".encode()
+        if key[3] is None:
+            mac = key[2].copy()
+            mac.update(signing_input)
+            valid = hmac.compare_digest(mac.digest(), signature)
+        else:
+            valid = key[3].verify(signing_input, key[2], signature)
+        if not valid:
+            raise InvalidToken("bad signature")
+
+        try:
+            payload = json.loads(_b64decode(payload_b64))
+        except ValueError:
+            raise InvalidToken("malformed payload")
+        if not isinstance(payload, dict):
+            raise InvalidToken("malformed payload")
+        self._validate(payload)
+        return payload
+
+    def _validate(self, payload: dict):
+        for claim in self.required_claims:
+            if payload.get(claim) is None:
+                raise InvalidToken(f"missing {claim}")
+        now = time.time()
+        exp = payload.get("exp")
+        if exp is not None:
+            if not isinstance(exp, (int, float)):
+                raise InvalidToken("bad exp")
+            if exp <= now - JWT_LEEWAY_SECONDS:
+                raise TokenExpired("token expired")
+        nbf = payload.get("nbf")
+        if nbf is not None and isinstance(nbf, (int, float)) and nbf > now + JWT_LEEWAY_SECONDS:
+            raise InvalidToken("token not yet valid")
+
+
+# PEM을 읽어서 (알고리즘, 개인키 또는 None, 공개키)를 돌려줌
+def load_asymmetric_key(pem: str):
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+    data = pem.encode()
+    if b"PRIVATE KEY" in data:
+        private = serialization.load_pem_private_key(data, password=None)
+        public = private.public_key()
+    else:
+        private = None
+        public = serialization.load_pem_public_key(data)
+
+    if isinstance(public, ed25519.Ed25519PublicKey):
+        return "EdDSA", private, public
+    if isinstance(public, ec.EllipticCurvePublicKey) and public.curve.name == "secp256r1":
+        return "ES256", private, public
+    raise ValueError("only Ed25519 and P-256 keys are supported")
+
+
+def build_access_codec():
+    keys = {}
+    # HMAC 키는 kid 없이 등록 - 비대칭 모드로 바꾼 뒤에도 이미 발급된 HS256 토큰은 만료될 때까지 통과
+    if SECRET_KEY:
+        keys[None] = (ALGORITHM, SECRET_KEY, SECRET_KEY)
+    if JWT_KEYS:
+        for kid, pem in json.loads(JWT_KEYS).items():
+            keys[kid] = load_asymmetric_key(pem)
+    if not keys:
+        return None
+    signing_kid = JWT_SIGNING_KID if JWT_KEYS and JWT_SIGNING_KID else None
+    if signing_kid not in keys:
+        raise ValueError("JWT_SIGNING_KID must name one of the keys in JWT_KEYS")
+    return TokenCodec(keys, signing_kid)
+
+
+access_codec = build_access_codec()
+# 리프레시 토큰은 이 서버만 검증하므로 계속 HMAC
+refresh_codec = TokenCodec.from_secret(REFRESH_SECRET_KEY) if REFRESH_SECRET_KEY else None
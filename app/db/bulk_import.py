@@ -0,0 +1,235 @@
+# 레거시 시스템에서 사용자를 대량으로 가져오는 모듈입니다. (NDJSON 또는 CSV)
+# 한 줄에 사용자 한 명: email, name, password(평문) 또는 hashed_password(레거시 해시)
+#
+#   python -m app.db.bulk_import users.ndjson
+#   python -m app.db.bulk_import users.csv --chunk-size 2000 --workers 8
+#
+# 관리자 API(POST /admin/users/import)도 같은 함수를 사용합니다.
+# - 청크 단위로 이미 있는 이메일을 먼저 걸러서 중복 행은 해시하지 않음 (중간에 끊겨도 다시 실행하면 이어짐)
+# - 평문 비밀번호는 프로세스 풀에서 병렬로 해시 (현재 해시 정책 사용)
+# - INSERT ... ON CONFLICT (email) DO NOTHING을 executemany로 실행
+# - 청크마다 진행 상황(dict)을 돌려줌
+# hashed_password는 현재 해시 정책이 알아보는 형식(bcrypt/argon2)만 받고, 다음 로그인 때 필요하면 재해시됩니다.
+# CSV는 한 줄 = 한 행만 지원 (따옴표 안의 줄바꿈 불가)
+
+import argparse
+import asyncio
+import csv
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from dotenv import load_dotenv
+from pydantic import ValidationError
+from sqlalchemy import select
+
+from app.db import crud
+from app.db.database import SessionLocal
+from app.db.models import User
+from app.db.schemas import ImportedUser
+from app.redis.user_cache import user_cache
+
+load_dotenv()
+
+BULK_IMPORT_CHUNK_SIZE = int(os.getenv("BULK_IMPORT_CHUNK_SIZE", "1000"))
+# 웹 워커와 CPU를 나눠 쓰므로 API로 가져올 때는 작게 잡는 것이 좋음
+BULK_IMPORT_WORKERS = int(os.getenv("BULK_IMPORT_WORKERS", str(os.cpu_count() or 1)))
+# 진행 상황에 담는 잘못된 행 예시 수
+MAX_REPORTED_ERRORS = 20
+
+
+def make_executor(workers: int, context_settings: dict | None) -> ProcessPoolExecutor:
+    if context_settings is None:
+        return ProcessPoolExecutor(max_workers=workers)
+    return ProcessPoolExecutor(
+        max_workers=workers, initializer=crud.configure_pwd_context, initargs=(context_settings,)
+    )
+
+
+def _hash_batch(passwords: list[str]) -> list[str]:
+    return [crud.get_password_hash(password) for password in passwords]
+
+
+async def _hash_passwords(executor, workers: int, passwords: list[str]) -> list[str]:
+    if not passwords:
+        return []
+    # 워커 수만큼 나눠서 한 번에 넘김 (비밀번호마다 프로세스 왕복하지 않게)
+    loop = asyncio.get_running_loop()
+    size = math.ceil(len(passwords) / workers)
+    batches = [passwords[i:i + size] for i in range(0, len(passwords), size)]
+    results = await asyncio.gather(*(loop.run_in_executor(executor, _hash_batch, b) for b in batches))
+    return [hashed for batch in results for hashed in batch]
+
+
+# 바이트 청크 스트림 -> 줄 단위 문자열
+async def iter_lines(chunks):
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8").rstrip("\r")
+
+
+# 디스크에 있는 파일을 읽는 동안 이벤트 루프를 막지 않도록 스레드에서 읽음 (1MB마다 한 번)
+async def iter_file_chunks(f, size: int = 1 << 20):
+    while chunk := await asyncio.to_thread(f.read, size):
+        yield chunk
+
+
+# 줄 -> dict (파싱할 수 없는 줄은 None)
+async def iter_records(lines, fmt: str):
+    header = None
+    async for line in lines:
+        if not line.strip():
+            continue
+        if fmt == "csv":
+            row = next(csv.reader([line]))
+            if header is None:
+                header = [name.strip() for name in row]
+                continue
+            yield dict(zip(header, row))
+        else:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+
+class ImportStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.processed = 0
+        self.inserted = 0
+        self.skipped = 0  # 이미 있는 이메일 (파일 안의 중복 포함)
+        self.invalid = 0
+        self.errors: list[dict] = []
+
+    def add_error(self, row: int, message: str):
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": message})
+
+    def progress(self) -> dict:
+        elapsed = time.perf_counter() - self.started
+        return {
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "skipped": self.skipped,
+            "invalid": self.invalid,
+            "elapsed_seconds": round(elapsed, 2),
+            "rows_per_second": round(self.processed / elapsed, 1) if elapsed else 0.0,
+            "errors": self.errors,
+        }
+
+
+async def _import_chunk(chunk: list, executor, workers: int, stats: ImportStats):
+    users: dict[str, ImportedUser] = {}
+    for row, record in enumerate(chunk, start=stats.processed + 1):
+        if not isinstance(record, dict):
+            stats.add_error(row, "malformed line")
+            continue
+        try:
+            user = ImportedUser.model_validate(record)
+        except ValidationError as exc:
+            stats.add_error(row, exc.errors(include_url=False)[0]["msg"])
+            continue
+        if not user.password and not crud.pwd_context.identify(user.hashed_password):
+            stats.add_error(row, "unsupported hashed_password format")
+            continue
+        if user.email in users:
+            stats.skipped += 1
+            continue
+        users[user.email] = user
+    stats.processed += len(chunk)
+    if not users:
+        return
+
+    # 해시하는 동안 DB 커넥션을 붙잡고 있지 않도록 조회와 INSERT는 세션을 따로 씀
+    async with SessionLocal() as db:
+        existing = set(
+            (await db.execute(select(User.email).where(User.email.in_(list(users))))).scalars()
+        )
+    new_users = [user for email, user in users.items() if email not in existing]
+    stats.skipped += len(existing)
+    if not new_users:
+        return
+
+    to_hash = [user for user in new_users if user.password]
+    hashes = dict(zip(
+        (user.email for user in to_hash),
+        await _hash_passwords(executor, workers, [user.password for user in to_hash]),
+    ))
+    rows = [
+        {
+            "email": user.email,
+            # UserOut.name이 필수라서 이름이 없는 레거시 계정은 이메일 앞부분을 씀
+            "name": user.name or user.email.split("@", 1)[0],
+            "hashed_password": hashes.get(user.email, user.hashed_password),
+        }
+        for user in new_users
+    ]
+    async with SessionLocal() as db:
+        # 해시하는 동안 다른 곳에서 가입했으면 ON CONFLICT로 건너뜀
+        result = await db.execute(
+            crud.insert_users_ignoring_existing(db.bind.dialect.name).returning(User.email), rows
+        )
+        inserted = result.scalars().all()
+        await db.commit()
+
+    stats.inserted += len(inserted)
+    stats.skipped += len(new_users) - len(inserted)
+    # 조회 실패로 캐시된 "없는 이메일" 표시 제거
+    await user_cache.forget_emails(inserted)
+
+
+# records: dict(또는 None)의 async iterator, 청크마다 진행 상황을 yield
+async def import_users(records, executor, workers: int, chunk_size: int = BULK_IMPORT_CHUNK_SIZE):
+    stats = ImportStats()
+    chunk = []
+    async for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            await _import_chunk(chunk, executor, workers, stats)
+            chunk = []
+            yield stats.progress()
+    if chunk:
+        await _import_chunk(chunk, executor, workers, stats)
+    yield stats.progress()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="bulk import users from NDJSON or CSV")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="default: from the file extension")
+    parser.add_argument("--chunk-size", type=int, default=BULK_IMPORT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=BULK_IMPORT_WORKERS)
+    return parser.parse_args()
+
+
+async def main():
+    from app.auth.password_policy import apply_password_policy
+    from app.db.database import engine
+
+    args = parse_args()
+    fmt = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    settings = await apply_password_policy()
+    executor = make_executor(args.workers, settings)
+    try:
+        with open(args.path, "rb") as f:
+            records = iter_records(iter_lines(iter_file_chunks(f)), fmt)
+            async for progress in import_users(records, executor, args.workers, args.chunk_size):
+                print(json.dumps({k: v for k, v in progress.items() if k != "errors"}), file=sys.stderr)
+        print(json.dumps(progress, ensure_ascii=False, indent=2))
+    finally:
+        executor.shutdown()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,49 +1,111 @@
 
 # 이 파일은 사용자 인증과 관련된 CRUD 작업을 수행하는 모듈입니다.
 # 사용자 생성, 조회, 비밀번호 해시화 및 검증 기능을 포함합니다.
-# 이 모듈은 FastAPI와 SQLAlchemy를 사용하여 데이터베이스와 상호작용합니다.
+# 이 모듈은 FastAPI와 SQLAlchemy(AsyncSession)를 사용하여 데이터베이스와 상호작용합니다.
 
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.db.models import User
 from passlib.context import CryptContext
 from app.db import models
+from app.db.schemas import UserRecord
+from app.redis.user_cache import user_cache
+from app.metrics.metrics import timed
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+# 해시 정책(app.auth.password_policy)이 정한 설정으로 컨텍스트 교체
+# 프로세스 풀 워커에서는 initializer로 호출됨
+def configure_pwd_context(settings: dict):
+    global pwd_context
+    pwd_context = CryptContext(**settings)
+
+
 # 비밀번호 해시 함수
 def get_password_hash(password: str):
     return pwd_context.hash(password)
 
+
+# 현재 정책과 알고리즘/비용이 다른 해시인지 (해시 문자열만 파싱하므로 가벼움)
+def password_needs_update(hashed_password: str) -> bool:
+    return pwd_context.needs_update(hashed_password)
+
 # 사용자 생성 함수
-# def create_user(db: Session, email: str, password: str,name: str):
-#     hashed_pw = get_password_hash(password) #비밀번호를 해시 함수에 넣어서 해시 값을 구함
-#     db_user = User(email=email, hashed_password=hashed_pw,name=name) 
-#     db.add(db_user)
-#     db.commit()
-#     db.refresh(db_user)
-#     return db_user
-
-
-def create_user(db: Session, email: str, password: str | None, name: str):
-    if password is not None:
-        hashed_pw = get_password_hash(password)
-    else:
-        hashed_pw = None
-
-    db_user = User(email=email, hashed_password=hashed_pw, name=name)
+# 비밀번호 해시는 이벤트 루프를 막지 않도록 호출하는 쪽에서 해시 풀(app.auth.hashing)로 미리 계산해서 넘김
+async def create_user(db: AsyncSession, email: str, hashed_password: str | None, name: str):
+    db_user = User(email=email, hashed_password=hashed_password, name=name)
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    # 공유 사용자 캐시에 바로 반영 (write-through)
+    await user_cache.store(db_user)
+    return db_user
+
+
+# 이미 있는 이메일이면 아무것도 하지 않는 INSERT (users.email 유니크 인덱스 기준)
+def insert_users_ignoring_existing(dialect_name: str):
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    return insert(User).on_conflict_do_nothing(index_elements=[User.email])
+
+
+# 회원가입용: 존재 확인 없이 INSERT ... ON CONFLICT DO NOTHING RETURNING 한 번으로 처리
+# 이미 가입된 이메일이면 None
+async def create_user_if_absent(db: AsyncSession, email: str, hashed_password: str, name: str):
+    result = await db.execute(
+        insert_users_ignoring_existing(db.bind.dialect.name)
+        .values(email=email, hashed_password=hashed_password, name=name)
+        .returning(User)
+    )
+    db_user = result.scalars().first()
+    await db.commit()
+    if db_user is not None:
+        await user_cache.store(db_user)
     return db_user
 
 
+# 로그인 후 재해시한 값 저장
+# 그 사이 비밀번호가 바뀌었으면 덮어쓰지 않도록 예전 해시가 그대로일 때만 갱신
+async def update_password_hash(db: AsyncSession, user, old_hash: str, new_hash: str) -> bool:
+    result = await db.execute(
+        update(User)
+        .where(User.id == user.id, User.hashed_password == old_hash)
+        .values(hashed_password=new_hash)
+    )
+    await db.commit()
+    # 공유 캐시에는 해시가 없으므로 캐시는 그대로 둠
+    return result.rowcount > 0
+
+
 # 사용자 조회 함수 추가
-def get_user_by_email(db: Session, email: str):
-    return db.query(models.User).filter(models.User.email == email).first()
+@timed("db_user_by_email")
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(models.User).where(models.User.email == email))
+    return result.scalars().first()
+
+
+@timed("db_user_by_id")
+async def get_user_by_id(db: AsyncSession, user_id: int):
+    return await db.get(models.User, user_id)
+
+
+# 로그인용: 비밀번호 해시는 공유 캐시에 두지 않으므로 항상 DB에서 읽음
+async def get_login_record_by_email(db: AsyncSession, email: str) -> UserRecord | None:
+    user = await get_user_by_email(db, email)
+    return UserRecord.model_validate(user) if user is not None else None
+
+
+# 공유 사용자 캐시(Redis)를 먼저 보고, 없을 때만 DB 조회 (프로필 필드만, UserSnapshot)
+async def get_user_record_by_email(db: AsyncSession, email: str):
+    return await user_cache.get_by_email(email, lambda: get_user_by_email(db, email))
+
+
+async def get_user_record_by_id(db: AsyncSession, user_id: int):
+    return await user_cache.get_by_id(user_id, lambda: get_user_by_id(db, user_id))
 
 
 # 비밀번호 검증 함수
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(plain_password, hashed_password)
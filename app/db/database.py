@@ -1,8 +1,10 @@
 
 # 이 파일은 SQLAlchemy를 사용하여 데이터베이스와 상호작용합니다
+# 요청 경로에서 DB 호출이 이벤트 루프를 막지 않도록 AsyncEngine / AsyncSession을 사용합니다.
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import NullPool
 
 from dotenv import load_dotenv
 import os
@@ -11,15 +13,86 @@ load_dotenv()  # 이거 꼭 해줘야 함
 
 DATABASE_URL = os.getenv("DATABASE_URL")  # 이건 .env에 설정하거나 Railway에 입력
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Railway가 주는 postgresql:// URL을 async 드라이버 URL로 바꿔줌
+# (Postgres → asyncpg, 로컬/테스트용 SQLite → aiosqlite)
+def to_async_url(url: str) -> str:
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    if url.startswith("postgresql://") or url.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+
+ASYNC_DATABASE_URL = to_async_url(DATABASE_URL)
+
+# 커넥션 풀 설정 (워커 수 × pool_size + overflow가 Postgres max_connections를 넘지 않게 맞출 것)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Railway가 오래 놀고 있는 연결을 끊기 때문에 그 전에 재연결
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# 0이면 사용하지 않음
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+# PgBouncer 같은 외부 풀러를 쓸 때는 앱 쪽 풀을 끄고(NullPool) prepared statement 캐시도 끔
+DB_EXTERNAL_POOLER = os.getenv("DB_EXTERNAL_POOLER", "false").lower() == "true"
+
+
+def engine_options(url: str) -> dict:
+    if url.startswith("sqlite"):
+        return {}
+
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    connect_args = {}
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        connect_args["server_settings"] = {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}
+
+    if DB_EXTERNAL_POOLER:
+        options["poolclass"] = NullPool
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+    else:
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+SessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,  # commit 후에도 응답 직렬화 시 추가 쿼리가 나가지 않도록
+)
 Base = declarative_base()
 
 
 #DB 세션을 만들어 주는 함수
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+# 풀 상태 (체크아웃/오버플로 수) - /health/db에서 사용
+def pool_stats() -> dict:
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__}
+    if hasattr(pool, "checkedout"):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=DB_MAX_OVERFLOW,
+        )
+    return stats
@@ -5,7 +5,7 @@
 
 
 
-from sqlalchemy import Column, Integer, String,ForeignKey
+from sqlalchemy import Column, Integer, String,ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base,engine
 import app.db.models as models
@@ -22,10 +22,20 @@ class User(Base):
     posts = relationship("Post", back_populates="owner")
 
 
+# posts.id는 Integer (Postgres int4) → 이보다 큰 커서 값은 드라이버에서 오류가 나므로 입력 단계에서 거절
+MAX_POST_ID = 2**31 - 1
+
+
 class Post(models.Base):
     __tablename__ = "posts"
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     content = Column(String, nullable=False)
     owner_id = Column(Integer, ForeignKey("users.id"))
-    owner = relationship("User", back_populates="posts")
\ No newline at end of file
+    owner = relationship("User", back_populates="posts")
+
+    __table_args__ = (
+        # /posts/mine: WHERE owner_id = ? ORDER BY id DESC 를 인덱스만으로 처리
+        # (Postgres에서는 title도 INCLUDE 해서 fields=id,title 조회가 index-only scan)
+        Index("ix_posts_owner_id_id", owner_id, id.desc(), postgresql_include=["title"]),
+    )
\ No newline at end of file
@@ -0,0 +1,105 @@
+# 글 전문 검색 쿼리를 만드는 모듈입니다. (GET /posts/search)
+# 색인은 Alembic 마이그레이션(a3c91f7d2e60)이 만듭니다.
+# - Postgres: posts.search_vector (제목 A / 본문 B 가중치 tsvector 생성 컬럼) + (owner_id, search_vector) GIN 인덱스
+#   검색어는 websearch_to_tsquery로 해석 ("따옴표 구문", -제외, or 지원), 순위는 ts_rank_cd
+# - SQLite(로컬/테스트): posts_fts FTS5 테이블, 검색어는 단어 AND, 순위는 bm25 (제목 가중치 10)
+# search_vector / posts_fts는 모델에 넣지 않음 (create_all로 만드는 SQLite 테이블과 select(Post)에 섞이지 않도록)
+#
+# 정렬은 (rank DESC, id DESC)이고 커서는 마지막 행의 "rank:id"입니다.
+# 같은 검색어면 rank가 매번 같으므로 OFFSET 없이 이어서 가져올 수 있습니다.
+
+import math
+import re
+
+from sqlalchemy import column, func, literal_column, select, table, tuple_
+
+import app.db.models as models
+
+# 마이그레이션의 생성 컬럼과 같은 설정이어야 GIN 인덱스를 씀
+SEARCH_TS_CONFIG = "simple"
+# bm25 컬럼 가중치 (title, content)
+FTS_TITLE_WEIGHT = 10.0
+FTS_CONTENT_WEIGHT = 1.0
+
+_posts_fts = table("posts_fts", column("rowid"))
+_WORD = re.compile(r"\w+")
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(rank: float, post_id: int) -> str:
+    # repr은 float를 그대로 되돌릴 수 있는 가장 짧은 표현
+    return f"{rank!r}:{post_id}"
+
+
+def decode_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        rank, post_id = cursor.rsplit(":", 1)
+        rank, post_id = float(rank), int(post_id)
+    except ValueError:
+        raise InvalidCursor(cursor) from None
+    if not math.isfinite(rank) or not 1 <= post_id <= models.MAX_POST_ID:
+        raise InvalidCursor(cursor)
+    return rank, post_id
+
+
+# 마이그레이션(a3c91f7d2e60)을 적용하지 않은 DB에서 나는 오류인지
+def is_missing_search_index(exc: Exception) -> bool:
+    message = str(getattr(exc, "orig", exc))
+    return "posts_fts" in message or "search_vector" in message
+
+
+def _fts5_query(q: str) -> str | None:
+    # FTS5 문법(AND/OR/NEAR/*, 따옴표)이 사용자 입력에서 오류를 내지 않도록 단어마다 따옴표로 감쌈
+    words = _WORD.findall(q)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words)
+
+
+def _ranked_matches(dialect_name: str, owner_id: int, q: str):
+    if dialect_name == "postgresql":
+        search_vector = literal_column("posts.search_vector")
+        query = func.websearch_to_tsquery(literal_column(f"'{SEARCH_TS_CONFIG}'::regconfig"), q)
+        return (
+            select(
+                models.Post.id,
+                models.Post.title,
+                models.Post.content,
+                func.ts_rank_cd(search_vector, query).label("rank"),
+            )
+            .where(models.Post.owner_id == owner_id)
+            .where(search_vector.op("@@")(query))
+        )
+
+    match = _fts5_query(q)
+    if match is None:
+        return None
+    fts = literal_column("posts_fts")
+    return (
+        select(
+            models.Post.id,
+            models.Post.title,
+            models.Post.content,
+            # bm25는 작을수록 관련도가 높으므로 부호를 바꿔서 Postgres와 같은 방향(클수록 위)으로
+            (-func.bm25(fts, FTS_TITLE_WEIGHT, FTS_CONTENT_WEIGHT)).label("rank"),
+        )
+        .select_from(_posts_fts)
+        .join(models.Post, models.Post.id == _posts_fts.c.rowid)
+        .where(fts.op("MATCH")(match))
+        .where(models.Post.owner_id == owner_id)
+    )
+
+
+# 검색 쿼리 (검색할 단어가 없으면 None)
+def search_statement(dialect_name: str, owner_id: int, q: str, limit: int, cursor: tuple[float, int] | None):
+    matches = _ranked_matches(dialect_name, owner_id, q)
+    if matches is None:
+        return None
+    ranked = matches.subquery("ranked")
+    stmt = select(ranked).order_by(ranked.c.rank.desc(), ranked.c.id.desc()).limit(limit)
+    if cursor is not None:
+        stmt = stmt.where(tuple_(ranked.c.rank, ranked.c.id) < tuple_(*cursor))
+    return stmt
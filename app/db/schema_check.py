@@ -0,0 +1,65 @@
+# 앱 시작 시 DB 스키마가 최신 Alembic 리비전인지 확인하는 모듈입니다.
+# 테이블을 만들거나 리플렉션하지 않고 alembic_version 한 줄만 읽어서 비교합니다.
+# 스키마 변경은 전부 `alembic upgrade head`로 합니다.
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.db.database import engine
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# strict: 리비전이 다르면 시작 실패 / warn: 로그만 남김 / off: 확인 안 함
+SCHEMA_CHECK = os.getenv("SCHEMA_CHECK", "warn").lower()
+# DB가 느려도 시작이 오래 멈추지 않도록
+SCHEMA_CHECK_TIMEOUT_SECONDS = float(os.getenv("SCHEMA_CHECK_TIMEOUT_SECONDS", "5"))
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def expected_heads() -> set[str]:
+    # alembic은 시작할 때만 필요하므로 여기서 import
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory.from_config(Config(str(ALEMBIC_INI))).get_heads())
+
+
+async def current_heads() -> set[str]:
+    from alembic.runtime.migration import MigrationContext
+
+    async with engine.connect() as conn:
+        heads = await conn.run_sync(lambda c: MigrationContext.configure(c).get_current_heads())
+    return set(heads)
+
+
+async def check_schema_revision():
+    if SCHEMA_CHECK == "off":
+        return
+    expected = expected_heads()
+    try:
+        current = await asyncio.wait_for(current_heads(), SCHEMA_CHECK_TIMEOUT_SECONDS)
+    except (asyncio.TimeoutError, OSError, SQLAlchemyError) as exc:
+        if SCHEMA_CHECK == "strict":
+            raise
+        logger.warning("could not read alembic revision at startup: %r", exc)
+        return
+    if current == expected:
+        return
+    message = (
+        f"database schema is at {sorted(current) or 'no revision'}, expected {sorted(expected)}; "
+        "run `alembic upgrade head`"
+    )
+    if SCHEMA_CHECK == "strict":
+        raise SchemaOutOfDate(message)
+    logger.warning(message)
@@ -4,7 +4,7 @@
 # FastAPI와 함께 사용되어 API 요청 및 응답의 데이터 구조를 정의합니다.
 
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, model_validator
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -32,3 +32,54 @@ class TokenOut(BaseModel):
 class PostCreate(BaseModel):
     title: str
     content: str
+
+class PostOut(BaseModel):
+    id: int
+    title: str
+    content: str
+    owner_id: int | None = None
+
+    model_config = {
+        "from_attributes": True
+    }
+
+# /posts/mine 목록 항목 (fields로 고른 컬럼만 담기고 id는 항상 포함)
+class PostListItem(BaseModel):
+    id: int
+    title: str | None = None
+    content: str | None = None
+    owner_id: int | None = None
+
+class PostSearchResult(BaseModel):
+    id: int
+    title: str
+    content: str
+    rank: float
+
+# 인증 캐시에 보관하는 가벼운 사용자 정보 (ORM 객체 대신 사용)
+class UserSnapshot(BaseModel):
+    id: int
+    email: str
+    name: str | None = None
+
+    model_config = {
+        "from_attributes": True,
+        "frozen": True,
+    }
+
+# 로그인에 필요한 비밀번호 해시까지 포함한 사용자 정보 (DB에서만 읽음, 캐시에 저장하지 않음)
+class UserRecord(UserSnapshot):
+    hashed_password: str | None = None
+
+# 대량 가져오기 한 줄 (평문 비밀번호 또는 레거시 시스템의 해시 중 하나)
+class ImportedUser(BaseModel):
+    email: EmailStr
+    name: str | None = None
+    password: str | None = None
+    hashed_password: str | None = None
+
+    @model_validator(mode="after")
+    def check_password(self):
+        if not self.password and not self.hashed_password:
+            raise ValueError("password or hashed_password is required")
+        return self
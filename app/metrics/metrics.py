@@ -0,0 +1,134 @@
+# Prometheus 지표 정의
+# 요청 전체 지연 시간(미들웨어)과 단계별 지연 시간(JWT 디코딩, 블랙리스트 조회, 사용자 조회, bcrypt, OAuth 호출)을 모읍니다.
+# 해시 풀, 토큰 캐시, 폐기 필터, DB 커넥션 풀 상태는 /metrics를 읽을 때 stats()에서 바로 가져옵니다.
+
+import functools
+import inspect
+import os
+import time
+from contextlib import contextmanager
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import GaugeMetricFamily
+
+# 대부분 단계가 ms 단위라 기본 버킷보다 촘촘하게
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+REQUEST_LATENCY = Histogram(
+    "authlab_http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_STARTED = Counter(
+    "authlab_http_requests_started_total",
+    "HTTP requests started",
+    ["method"],
+)
+STAGE_LATENCY = Histogram(
+    "authlab_stage_duration_seconds",
+    "Latency of individual request stages",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+STAGE_ERRORS = Counter(
+    "authlab_stage_errors_total",
+    "Stages that raised",
+    ["stage"],
+)
+
+
+# with stage_timer("jwt_decode"): ...
+@contextmanager
+def stage_timer(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.labels(stage).inc()
+        raise
+    finally:
+        STAGE_LATENCY.labels(stage).observe(time.perf_counter() - started)
+
+
+# 함수 전체를 한 단계로 측정하는 데코레이터 (sync/async 모두 지원)
+def timed(stage: str):
+    def decorator(func):
+        # 라벨 조회 비용을 호출마다 내지 않도록 미리 만들어 둠
+        histogram = STAGE_LATENCY.labels(stage)
+        errors = STAGE_ERRORS.labels(stage)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except Exception:
+                    errors.inc()
+                    raise
+                finally:
+                    histogram.observe(time.perf_counter() - started)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - started)
+
+        return wrapper
+
+    return decorator
+
+
+class StatsCollector:
+    # name -> stats()를 돌려주는 함수, 숫자 값만 gauge로 내보냄
+    def __init__(self):
+        self._sources = {}
+
+    def add_source(self, name: str, stats):
+        self._sources[name] = stats
+
+    def collect(self):
+        for name, stats in self._sources.items():
+            try:
+                values = stats()
+            except Exception:
+                continue
+            for key, value in values.items():
+                if isinstance(value, bool):
+                    value = int(value)
+                if isinstance(value, (int, float)):
+                    yield GaugeMetricFamily(f"authlab_{name}_{key}", f"{name} {key}", value=value)
+
+
+stats_collector = StatsCollector()
+REGISTRY.register(stats_collector)
+
+
+def render_metrics() -> tuple[bytes, str]:
+    # 여러 Hypercorn 워커의 지표를 합치려면 PROMETHEUS_MULTIPROC_DIR를 설정
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        registry.register(stats_collector)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,37 @@
+# 요청 지연 시간을 라우트 템플릿(/posts/mine 등) 단위로 기록하는 ASGI 미들웨어
+# BaseHTTPMiddleware보다 오버헤드가 적도록 순수 ASGI로 작성했습니다.
+
+import time
+
+from app.metrics.metrics import REQUEST_LATENCY, REQUESTS_STARTED
+
+EXCLUDED_PATHS = {"/metrics"}
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        REQUESTS_STARTED.labels(method).inc()
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # 라우팅이 끝나면 FastAPI가 scope["route"]에 매칭된 라우트를 넣어 줌
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            REQUEST_LATENCY.labels(method, path, str(status_code)).observe(time.perf_counter() - started)
@@ -0,0 +1,122 @@
+# 사용자별 "내용 버전"을 Redis에 두고 조건부 GET(ETag / If-None-Match)에 쓰는 모듈입니다.
+# SPA가 /users/me, /posts/mine을 자주 폴링하므로 바뀐 게 없으면 DB 조회 없이 304로 끝냄
+#
+#   ver:{scope}:{user_id}  현재 버전 (scope: user = 사용자 정보, posts = 글 목록)
+#
+# 쓰기(커밋 후)마다 버전을 새 값으로 바꾸고, 응답 ETag는 버전(+ 쿼리스트링)에서 만듭니다.
+# 버전은 INCR 숫자가 아니라 매번 새 임의 값이라서, 키가 만료/축출된 뒤 다시 만들어져도 예전 ETag와 겹치지 않습니다.
+# 버전을 읽는 쪽은 항상 DB 조회 전에 읽어야 함 (커밋 전 데이터에 새 버전이 붙지 않도록)
+# Redis가 안 되면 ETag 없이 평소처럼 응답
+# 버전 갱신이 실패하면 키를 지우고, 그것도 실패하면 이 프로세스는 키를 지울 때까지 ETag를 붙이지 않음
+# (예전 버전이 남아서 바뀐 내용에 304가 나가지 않도록)
+#
+# user scope(/users/me: id, email, name)는 지금은 바꾸는 API가 없음
+# 이메일/이름을 바꾸는 쓰기를 추가하면 커밋 후 bump_version(user_id, USER_SCOPE)를 호출할 것
+
+import hashlib
+import logging
+import os
+import uuid
+
+from dotenv import load_dotenv
+from redis.exceptions import RedisError
+
+from app.redis.redis_client import redis
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# 버전 키 수명: 갱신과 삭제가 모두 실패했을 때 다른 워커에서 예전 ETag가 304를 받을 수 있는 최대 시간
+# (만료되면 새 버전이 만들어져 한 번 200을 보낼 뿐이므로 짧게 잡음)
+CONTENT_VERSION_TTL_SECONDS = int(os.getenv("CONTENT_VERSION_TTL_SECONDS", "300"))
+# 사용자별 응답이므로 공유 캐시에는 두지 않고, 브라우저는 매번 If-None-Match로 재검증
+CACHE_CONTROL = "private, no-cache"
+
+USER_SCOPE = "user"
+POSTS_SCOPE = "posts"
+
+
+def _key(scope: str, user_id: int) -> str:
+    return f"ver:{scope}:{user_id}"
+
+
+def _new_version() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+# 갱신도 삭제도 못 한 버전 키 (다음 읽기에서 다시 지워 봄)
+_stale_keys: set[str] = set()
+
+
+async def _drop_stale(key: str) -> bool:
+    try:
+        await redis.delete(key)
+    except RedisError:
+        return False
+    _stale_keys.discard(key)
+    return True
+
+
+# 현재 버전 (없으면 새로 만듦), Redis 오류면 None
+async def current_version(user_id: int, scope: str) -> str | None:
+    key = _key(scope, user_id)
+    if key in _stale_keys and not await _drop_stale(key):
+        return None
+    try:
+        version = await redis.get(key)
+        if version is not None:
+            return version
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.set(key, _new_version(), nx=True, ex=CONTENT_VERSION_TTL_SECONDS)
+            pipe.get(key)
+            _, version = await pipe.execute()
+        return version
+    except RedisError:
+        return None
+
+
+# 커밋 후 호출 (여러 scope를 한 번의 왕복으로)
+async def bump_version(user_id: int, *scopes: str):
+    keys = [_key(scope, user_id) for scope in scopes]
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.set(key, _new_version(), ex=CONTENT_VERSION_TTL_SECONDS)
+            await pipe.execute()
+        _stale_keys.difference_update(keys)
+        return
+    except RedisError as exc:
+        logger.warning("failed to bump content version for user %s %s: %r", user_id, scopes, exc)
+    # 예전 버전이 남지 않도록 키를 지움 (다음 읽기에서 새 버전이 만들어짐)
+    for key in keys:
+        _stale_keys.add(key)
+        await _drop_stale(key)
+
+
+# variant: 같은 버전이라도 응답이 달라지는 요청 값 (쿼리스트링 등)
+def make_etag(version: str, variant: str = "") -> str:
+    if variant:
+        version += "-" + hashlib.blake2b(variant.encode(), digest_size=6).hexdigest()
+    return f'W/"{version}"'
+
+
+# If-None-Match는 약한 비교 (W/ 접두사 무시), 여러 개 또는 * 가능
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+# 응답에 붙일 헤더와 304 여부
+async def conditional_headers(
+    user_id: int, scope: str, if_none_match: str | None, variant: str = ""
+) -> tuple[dict, bool]:
+    version = await current_version(user_id, scope)
+    if version is None:
+        return {"Cache-Control": CACHE_CONTROL}, False
+    etag = make_etag(version, variant)
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}, etag_matches(if_none_match, etag)
@@ -1,10 +1,188 @@
 # redis 클라이언트 세팅 (redis 4.x 이상 사용 시)
+# 앱 전체가 이 모듈의 redis 하나를 공유합니다. 만들 때는 연결하지 않고, 첫 명령에서 풀이 연결을 엽니다.
+# - 커넥션 풀 최대 크기, 풀이 가득 찼을 때 기다리는 시간, 소켓/연결 타임아웃, health check 간격
+# - 연결 오류/타임아웃은 지수 백오프로 몇 번 재시도
+# - 그래도 연속으로 실패하면 서킷 브레이커가 열려서 한동안 Redis를 부르지 않고 바로 RedisCircuitOpen을 냄
+#   (RedisCircuitOpen은 redis ConnectionError라서 호출하는 쪽의 `except RedisError` 대체 경로가 그대로 동작)
+# 연결 확인과 종료는 앱 lifespan이 담당합니다. (start_redis / close_redis)
+# 테스트에서는 fakeredis 풀을 넘겨서 같은 클래스를 그대로 쓸 수 있습니다:
+#   ManagedRedis(connection_pool=fakeredis.FakeAsyncRedis(decode_responses=True).connection_pool)
+
+import logging
+import os
+import time
 
 import redis.asyncio as redis_async
 from dotenv import load_dotenv
-import os
+from redis.asyncio.client import Pipeline
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, RedisError, TimeoutError
+from redis.retry import Retry
+
+from app.metrics.metrics import STAGE_ERRORS, STAGE_LATENCY
 
 load_dotenv()  # 필수
 
+logger = logging.getLogger(__name__)
+
 REDIS_URL = os.getenv("REDIS_URL")
-redis = redis_async.from_url(REDIS_URL, encoding="utf-8", decode_responses=True)
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+# 풀이 가득 찼을 때 연결을 기다리는 최대 시간 (초)
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "0.5"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "0.5"))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+REDIS_RETRIES = int(os.getenv("REDIS_RETRIES", "2"))
+REDIS_RETRY_BACKOFF_BASE = float(os.getenv("REDIS_RETRY_BACKOFF_BASE", "0.01"))
+REDIS_RETRY_BACKOFF_CAP = float(os.getenv("REDIS_RETRY_BACKOFF_CAP", "0.1"))
+# 연속 실패가 이만큼 쌓이면 브레이커를 열고, 이 시간 동안은 바로 실패
+REDIS_BREAKER_THRESHOLD = int(os.getenv("REDIS_BREAKER_THRESHOLD", "5"))
+REDIS_BREAKER_RESET_SECONDS = float(os.getenv("REDIS_BREAKER_RESET_SECONDS", "5"))
+
+# 브레이커가 실패로 세는 오류 (응답 오류 같은 명령 단위 오류는 Redis가 살아 있다는 뜻이므로 제외)
+_OUTAGE_ERRORS = (ConnectionError, TimeoutError, OSError)
+
+
+class RedisCircuitOpen(ConnectionError):
+    pass
+
+
+class CircuitBreaker:
+    # closed: 정상 / open: 바로 실패 / half-open: 재설정 시간이 지나서 시험 호출 하나만 통과
+    def __init__(self, threshold: int, reset_seconds: float):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.open_until = 0.0
+        self.trial_in_flight = False
+        self.opened = 0  # 열린 횟수
+        self.rejected = 0  # 열려 있어서 바로 실패시킨 호출 수
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.threshold:
+            return "closed"
+        if time.monotonic() < self.open_until:
+            return "open"
+        return "half-open"
+
+    def before_call(self):
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half-open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return
+        self.rejected += 1
+        raise RedisCircuitOpen("redis circuit breaker is open")
+
+    def record_success(self):
+        self.failures = 0
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.failures == self.threshold:
+            self.opened += 1
+            logger.warning("redis circuit breaker opened after %d failures", self.failures)
+        if self.failures >= self.threshold:
+            # half-open 시험 호출이 실패해도 다시 재설정 시간만큼 열어 둠
+            self.open_until = time.monotonic() + self.reset_seconds
+
+
+breaker = CircuitBreaker(REDIS_BREAKER_THRESHOLD, REDIS_BREAKER_RESET_SECONDS)
+
+_command_latency = STAGE_LATENCY.labels("redis")
+_command_errors = STAGE_ERRORS.labels("redis")
+_pipeline_latency = STAGE_LATENCY.labels("redis_pipeline")
+_pipeline_errors = STAGE_ERRORS.labels("redis_pipeline")
+
+
+async def _guarded(call, latency, errors):
+    breaker.before_call()
+    started = time.perf_counter()
+    try:
+        result = await call()
+    except _OUTAGE_ERRORS:
+        breaker.record_failure()
+        errors.inc()
+        raise
+    except BaseException:
+        # 명령 오류나 취소는 연결 상태와 무관
+        breaker.trial_in_flight = False
+        raise
+    finally:
+        latency.observe(time.perf_counter() - started)
+    breaker.record_success()
+    return result
+
+
+class ManagedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        return await _guarded(
+            lambda: super(ManagedPipeline, self).execute(raise_on_error), _pipeline_latency, _pipeline_errors
+        )
+
+
+class ManagedRedis(redis_async.Redis):
+    async def execute_command(self, *args, **options):
+        return await _guarded(
+            lambda: super(ManagedRedis, self).execute_command(*args, **options), _command_latency, _command_errors
+        )
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> ManagedPipeline:
+        return ManagedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+def build_connection_pool(url: str):
+    return redis_async.BlockingConnectionPool.from_url(
+        url,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        timeout=REDIS_POOL_TIMEOUT,
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+        retry=Retry(ExponentialBackoff(cap=REDIS_RETRY_BACKOFF_CAP, base=REDIS_RETRY_BACKOFF_BASE), REDIS_RETRIES),
+        encoding="utf-8",
+        decode_responses=True,
+    )
+
+
+redis = ManagedRedis(connection_pool=build_connection_pool(REDIS_URL))
+
+
+# 읽기 명령 여러 개를 한 번의 왕복으로 (MULTI 없이) → 명령 순서대로 결과
+#   exists, data = await pipelined_reads(("exists", "bl:..."), ("hgetall", "user:1"))
+async def pipelined_reads(*commands: tuple) -> list:
+    async with redis.pipeline(transaction=False) as pipe:
+        for name, *args in commands:
+            getattr(pipe, name)(*args)
+        return await pipe.execute()
+
+
+def redis_stats() -> dict:
+    pool = redis.connection_pool
+    in_use = len(getattr(pool, "_in_use_connections", ()))
+    return {
+        "breaker_state": breaker.state,
+        "breaker_open": breaker.state != "closed",
+        "consecutive_failures": breaker.failures,
+        "breaker_opened": breaker.opened,
+        "breaker_rejected": breaker.rejected,
+        "pool_max_connections": pool.max_connections,
+        "pool_in_use": in_use,
+        "pool_idle": len(getattr(pool, "_available_connections", ())),
+    }
+
+
+# 앱 시작 시 연결 확인 (Redis가 없어도 DB/프로세스 메모리로 대체하는 경로가 있으므로 경고만 남김)
+async def start_redis():
+    try:
+        await redis.ping()
+    except RedisError as exc:
+        logger.warning("redis is not reachable at startup: %r", exc)
+
+
+async def close_redis():
+    await redis.aclose(close_connection_pool=True)
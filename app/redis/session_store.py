@@ -0,0 +1,174 @@
+# 리프레시 토큰 "패밀리"(로그인 세션)를 Redis에 저장하는 모듈입니다.
+# 로그인할 때마다 패밀리를 하나 만들고, 리프레시할 때마다 패밀리의 현재 jti를 새 값으로 교체(rotation)합니다.
+# 이미 교체된 예전 리프레시 토큰이 다시 들어오면(탈취 의심) 패밀리 전체를 바로 폐기합니다.
+# 단, 바로 직전 토큰이 교체 후 REFRESH_REUSE_GRACE_SECONDS 안에 다시 오면 (여러 탭이 같은 쿠키로 동시에 리프레시)
+# 폐기하지 않고 이미 교체된 현재 jti를 그대로 돌려줍니다.
+#
+#   rt:fam:{family_id}  해시 {user_id, jti, prev_jti, rotated_at, created_at, last_used_at, user_agent}
+#   rt:user:{user_id}   해당 사용자의 family_id 집합 (세션 목록/전체 폐기를 SCAN 없이 처리)
+
+import os
+import time
+import uuid
+
+from dotenv import load_dotenv
+
+from app.redis.redis_client import redis
+from app.auth.auth import REFRESH_TOKEN_EXPIRE_DAYS, blacklist_key
+
+load_dotenv()
+
+SESSION_TTL_SECONDS = REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+# 동시 리프레시를 재사용(탈취)으로 보지 않는 시간 (초)
+REFRESH_REUSE_GRACE_SECONDS = int(os.getenv("REFRESH_REUSE_GRACE_SECONDS", "10"))
+
+ROTATED = 1
+CONCURRENT = 2  # 직전 토큰이 유예 시간 안에 다시 옴 → 이미 교체된 현재 jti를 돌려줌
+UNKNOWN = 0  # 만료되었거나 이미 폐기된 패밀리
+REUSED = -1  # 예전 토큰 재사용 → 패밀리 폐기됨
+
+
+def _family_key(family_id: str) -> str:
+    return f"rt:fam:{family_id}"
+
+
+def _user_key(user_id: int | str) -> str:
+    return f"rt:user:{user_id}"
+
+
+# KEYS[1]=패밀리, KEYS[2]=사용자 집합, KEYS[3]=제시된 jti의 블랙리스트 키
+# ARGV = 제시된 jti, 새 jti, ttl, 현재 시각, family_id, 유예 시간
+# 반환: {결과, 발급할 jti}
+# 블랙리스트(로그아웃) 확인도 같은 호출에서 해서 리프레시 한 번에 Redis 왕복 한 번
+_ROTATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[3]) == 1 then
+    return {0, ''}
+end
+local current = redis.call('HGET', KEYS[1], 'jti')
+if not current then
+    redis.call('SREM', KEYS[2], ARGV[5])
+    return {0, ''}
+end
+if current ~= ARGV[1] then
+    local rotated_at = tonumber(redis.call('HGET', KEYS[1], 'rotated_at') or '0')
+    if redis.call('HGET', KEYS[1], 'prev_jti') == ARGV[1]
+        and tonumber(ARGV[4]) - rotated_at <= tonumber(ARGV[6]) then
+        return {2, current}
+    end
+    redis.call('DEL', KEYS[1])
+    redis.call('SREM', KEYS[2], ARGV[5])
+    return {-1, ''}
+end
+redis.call('HSET', KEYS[1], 'jti', ARGV[2], 'prev_jti', ARGV[1], 'rotated_at', ARGV[4], 'last_used_at', ARGV[4])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return {1, ARGV[2]}
+"""
+
+# KEYS[1]=사용자 집합 / ARGV[1]=패밀리 키 접두사
+# 만료된 패밀리는 집합에서 정리하고, 살아 있는 패밀리의 해시를 한 번에 돌려줌
+_LIST_SCRIPT = """
+local result = {}
+for _, family_id in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+    local data = redis.call('HGETALL', ARGV[1] .. family_id)
+    if #data == 0 then
+        redis.call('SREM', KEYS[1], family_id)
+    else
+        table.insert(result, family_id)
+        table.insert(result, data)
+    end
+end
+return result
+"""
+
+# KEYS[1]=패밀리, KEYS[2]=사용자 집합 / ARGV = family_id, user_id
+# 다른 사용자의 패밀리는 지우지 않도록 소유자를 확인
+_REVOKE_SCRIPT = """
+redis.call('SREM', KEYS[2], ARGV[1])
+if redis.call('HGET', KEYS[1], 'user_id') ~= ARGV[2] then
+    return 0
+end
+redis.call('DEL', KEYS[1])
+return 1
+"""
+
+# KEYS[1]=사용자 집합 / ARGV[1]=패밀리 키 접두사
+_REVOKE_ALL_SCRIPT = """
+local families = redis.call('SMEMBERS', KEYS[1])
+for _, family_id in ipairs(families) do
+    redis.call('DEL', ARGV[1] .. family_id)
+end
+redis.call('DEL', KEYS[1])
+return #families
+"""
+
+_rotate = redis.register_script(_ROTATE_SCRIPT)
+_list = redis.register_script(_LIST_SCRIPT)
+_revoke = redis.register_script(_REVOKE_SCRIPT)
+_revoke_all = redis.register_script(_REVOKE_ALL_SCRIPT)
+
+
+# 로그인 시 새 패밀리 생성 → (family_id, jti)
+async def start_session(user_id: int, user_agent: str | None = None) -> tuple[str, str]:
+    family_id = uuid.uuid4().hex
+    jti = uuid.uuid4().hex
+    now = str(int(time.time()))
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.hset(
+            _family_key(family_id),
+            mapping={
+                "user_id": str(user_id),
+                "jti": jti,
+                "created_at": now,
+                "last_used_at": now,
+                "user_agent": user_agent or "",
+            },
+        )
+        pipe.expire(_family_key(family_id), SESSION_TTL_SECONDS)
+        pipe.sadd(_user_key(user_id), family_id)
+        pipe.expire(_user_key(user_id), SESSION_TTL_SECONDS)
+        await pipe.execute()
+    return family_id, jti
+
+
+# 리프레시 시 원자적으로 jti 교체 → (결과, 발급할 jti)
+# CONCURRENT면 먼저 온 요청이 받은 것과 같은 jti (두 탭이 같은 세션을 계속 씀)
+async def rotate_session(user_id: int | str, family_id: str, presented_jti: str) -> tuple[int, str]:
+    result, jti = await _rotate(
+        keys=[_family_key(family_id), _user_key(user_id), blacklist_key(presented_jti)],
+        args=[
+            presented_jti,
+            uuid.uuid4().hex,
+            SESSION_TTL_SECONDS,
+            int(time.time()),
+            family_id,
+            REFRESH_REUSE_GRACE_SECONDS,
+        ],
+    )
+    return int(result), jti
+
+
+async def revoke_session(user_id: int | str, family_id: str) -> bool:
+    result = await _revoke(
+        keys=[_family_key(family_id), _user_key(user_id)],
+        args=[family_id, str(user_id)],
+    )
+    return bool(result)
+
+
+async def revoke_all_sessions(user_id: int | str) -> int:
+    return int(await _revoke_all(keys=[_user_key(user_id)], args=[_family_key("")]))
+
+
+async def list_sessions(user_id: int | str) -> list[dict]:
+    raw = await _list(keys=[_user_key(user_id)], args=[_family_key("")])
+    sessions = []
+    for family_id, data in zip(raw[::2], raw[1::2]):
+        fields = dict(zip(data[::2], data[1::2]))
+        sessions.append({
+            "family_id": family_id,
+            "created_at": int(fields.get("created_at", 0)),
+            "last_used_at": int(fields.get("last_used_at", 0)),
+            "user_agent": fields.get("user_agent") or None,
+        })
+    return sessions
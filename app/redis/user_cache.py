@@ -0,0 +1,191 @@
+# 여러 워커/레플리카가 함께 쓰는 Redis 사용자 캐시입니다.
+# 사용자 정보는 id 키(user:{id})에 해시로 저장하고, 이메일 키(user:email:{email})는 id만 가리킵니다.
+# 프로필 필드(id, email, name)만 저장하고 비밀번호 해시는 넣지 않습니다. (로그인은 DB에서 해시를 읽음)
+# 같은 키가 동시에 비어 있을 때 DB 쿼리가 N번 나가지 않도록
+# 프로세스 안에서는 single-flight, 프로세스 사이에서는 짧은 Redis 락을 사용합니다.
+
+import asyncio
+import os
+
+from dotenv import load_dotenv
+from redis.exceptions import RedisError
+
+from app.redis.redis_client import redis
+from app.db.schemas import UserSnapshot
+from app.auth.token_cache import token_cache
+
+load_dotenv()
+
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "300"))
+# 존재하지 않는 이메일도 잠깐 기억해서 같은 이메일로 반복되는 조회를 막음
+USER_CACHE_MISSING_TTL_SECONDS = int(os.getenv("USER_CACHE_MISSING_TTL_SECONDS", "30"))
+USER_CACHE_LOCK_MS = int(os.getenv("USER_CACHE_LOCK_MS", "2000"))
+USER_CACHE_LOCK_WAIT_SECONDS = float(os.getenv("USER_CACHE_LOCK_WAIT_SECONDS", "0.5"))
+
+MISSING = "0"
+
+
+def _id_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def _email_key(email: str) -> str:
+    return f"user:email:{email}"
+
+
+def _encode(user) -> dict:
+    data = {"id": user.id, "email": user.email}
+    # None 값은 필드를 아예 넣지 않음
+    if user.name is not None:
+        data["name"] = user.name
+    return data
+
+
+def _decode(data: dict) -> UserSnapshot | None:
+    if not data:
+        return None
+    # 예전 버전이 저장한 hashed_password 필드는 무시 (TTL이 지나면 사라짐)
+    return UserSnapshot(id=int(data["id"]), email=data["email"], name=data.get("name"))
+
+
+class UserCache:
+    def __init__(self):
+        # 진행 중인 DB 조회 (같은 키는 한 번만 조회)
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def get_by_id(self, user_id: int, loader) -> UserSnapshot | None:
+        key = _id_key(user_id)
+
+        async def read():
+            return _decode(await redis.hgetall(key))
+
+        return await self._get_or_load(key, read, loader)
+
+    async def get_by_email(self, email: str, loader) -> UserSnapshot | None:
+        key = _email_key(email)
+
+        async def read():
+            user_id = await redis.get(key)
+            if user_id is None:
+                return None
+            if user_id == MISSING:
+                return MISSING
+            return _decode(await redis.hgetall(_id_key(int(user_id))))
+
+        return await self._get_or_load(key, read, loader, remember_missing=True)
+
+    # 다른 읽기와 한 파이프라인으로 묶을 때: 보낼 명령 / 그 결과(hgetall)로 사용자 얻기
+    def id_read_command(self, user_id: int) -> tuple:
+        return ("hgetall", _id_key(user_id))
+
+    async def get_by_id_from(self, user_id: int, data: dict, loader) -> UserSnapshot | None:
+        cached = _decode(data)
+        if cached is not None:
+            return cached
+        return await self.get_by_id(user_id, loader)
+
+    async def _get_or_load(self, key: str, read, loader, remember_missing: bool = False):
+        try:
+            cached = await read()
+        except RedisError:
+            # Redis가 안 되면 그냥 DB에서 읽음
+            return await self._load_from_db(loader)
+        if cached == MISSING:
+            return None
+        if cached is not None:
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            user = await self._fill(key, read, loader, remember_missing)
+            future.set_result(user)
+            return user
+        except BaseException as exc:
+            future.set_exception(exc)
+            # 기다리는 쪽이 없으면 "exception was never retrieved" 경고가 나지 않게 처리
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _fill(self, key: str, read, loader, remember_missing: bool):
+        lock_key = f"lock:{key}"
+        try:
+            locked = await redis.set(lock_key, "1", nx=True, px=USER_CACHE_LOCK_MS)
+        except RedisError:
+            return await self._load_from_db(loader)
+
+        if not locked:
+            # 다른 워커가 채우는 중이면 잠깐 기다렸다가 캐시를 다시 읽음
+            deadline = asyncio.get_running_loop().time() + USER_CACHE_LOCK_WAIT_SECONDS
+            while asyncio.get_running_loop().time() < deadline:
+                await asyncio.sleep(0.02)
+                try:
+                    cached = await read()
+                except RedisError:
+                    break
+                if cached == MISSING:
+                    return None
+                if cached is not None:
+                    return cached
+            return await self._load_from_db(loader)
+
+        try:
+            user = await self._load_from_db(loader)
+            if user is not None:
+                await self.store(user)
+            elif remember_missing:
+                await redis.set(key, MISSING, ex=USER_CACHE_MISSING_TTL_SECONDS)
+            return user
+        except RedisError:
+            return user
+        finally:
+            try:
+                await redis.delete(lock_key)
+            except RedisError:
+                pass
+
+    async def _load_from_db(self, loader) -> UserSnapshot | None:
+        user = await loader()
+        if user is None:
+            return None
+        return UserSnapshot.model_validate(user)
+
+    # write-through: DB에 쓴 직후 최신 값으로 캐시를 채움
+    async def store(self, user):
+        data = _encode(user)
+        try:
+            async with redis.pipeline(transaction=True) as pipe:
+                pipe.delete(_id_key(user.id))
+                pipe.hset(_id_key(user.id), mapping=data)
+                pipe.expire(_id_key(user.id), USER_CACHE_TTL_SECONDS)
+                pipe.set(_email_key(user.email), user.id, ex=USER_CACHE_TTL_SECONDS)
+                await pipe.execute()
+        except RedisError:
+            pass
+
+    # 사용자 정보가 바뀌면 공유 캐시와 이 프로세스의 토큰 캐시를 함께 비움
+    async def invalidate(self, user_id: int, *emails: str):
+        token_cache.invalidate_user(user_id)
+        keys = [_id_key(user_id)] + [_email_key(email) for email in emails]
+        try:
+            await redis.delete(*keys)
+        except RedisError:
+            pass
+
+    # 캐시를 거치지 않고 새로 생긴 이메일(대량 가져오기)의 "없음" 표시를 지움
+    async def forget_emails(self, emails):
+        if not emails:
+            return
+        try:
+            await redis.delete(*[_email_key(email) for email in emails])
+        except RedisError:
+            pass
+
+
+user_cache = UserCache()
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import os
+import secrets
+import tempfile
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from app.auth.hashing import password_hasher
+from app.db.bulk_import import (
+    BULK_IMPORT_CHUNK_SIZE,
+    BULK_IMPORT_WORKERS,
+    import_users,
+    iter_file_chunks,
+    iter_lines,
+    iter_records,
+    make_executor,
+)
+
+# 관리자 API 토큰 (설정하지 않으면 관리자 API 자체를 끔)
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN")
+
+router = APIRouter(prefix="/admin", tags=["admin"], include_in_schema=False)
+
+# 대량 가져오기는 CPU를 많이 쓰므로 프로세스당 하나만
+_import_lock = asyncio.Lock()
+# 업로드 본문을 메모리에 두는 최대 크기 (넘으면 임시 파일로)
+IMPORT_SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+
+def require_admin(request: Request):
+    if not ADMIN_API_TOKEN:
+        raise HTTPException(status_code=404)
+    token = request.headers.get("x-admin-token", "")
+    if not secrets.compare_digest(token.encode(), ADMIN_API_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다.")
+
+
+# 응답을 보내다가 끊기거나 본문 제너레이터가 시작도 안 된 채 취소돼도 cleanup이 반드시 실행되는 스트리밍 응답
+class StreamingResponseWithCleanup(StreamingResponse):
+    def __init__(self, content, cleanup, **kwargs):
+        super().__init__(content, **kwargs)
+        self.cleanup = cleanup
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.cleanup()
+
+
+# 사용자 대량 가져오기 (본문: NDJSON 또는 CSV, 응답: 청크마다 진행 상황을 NDJSON으로 스트리밍)
+@router.post("/users/import", dependencies=[Depends(require_admin)])
+async def import_users_endpoint(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    chunk_size: int = Query(BULK_IMPORT_CHUNK_SIZE, ge=1, le=10000),
+):
+    # 확인과 획득 사이에 await가 없으므로 두 요청이 함께 통과할 수 없음 (잠겨 있지 않으면 acquire는 바로 끝남)
+    if _import_lock.locked():
+        raise HTTPException(status_code=409, detail="이미 가져오기가 진행 중입니다.")
+    await _import_lock.acquire()
+
+    # 스트리밍 응답이 시작되면 Starlette가 receive로 연결 끊김을 기다리면서 남은 본문을 가져가 버리므로
+    # 본문은 응답 전에 끝까지 받아 둠 (UploadFile: 메모리를 넘어 디스크로 가면 쓰기를 스레드에서)
+    upload = UploadFile(tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_MAX_MEMORY))
+    try:
+        async for chunk in request.stream():
+            await upload.write(chunk)
+        await upload.seek(0)
+        executor = make_executor(BULK_IMPORT_WORKERS, password_hasher.context_settings)
+    except BaseException:
+        upload.file.close()
+        _import_lock.release()
+        raise
+
+    def cleanup():
+        executor.shutdown(wait=False, cancel_futures=True)
+        upload.file.close()
+        _import_lock.release()
+
+    async def stream():
+        records = iter_records(iter_lines(iter_file_chunks(upload.file)), format)
+        async for progress in import_users(records, executor, BULK_IMPORT_WORKERS, chunk_size):
+            yield json.dumps(progress, ensure_ascii=False) + "\n"
+
+    return StreamingResponseWithCleanup(stream(), cleanup, media_type="application/x-ndjson")
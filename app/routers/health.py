@@ -0,0 +1,60 @@
+import time
+from fastapi import APIRouter, HTTPException
+from sqlalchemy import text
+from app.db.database import engine, pool_stats
+from app.auth.hashing import password_hasher
+from app.auth.token_cache import token_cache
+from app.auth.revocation_filter import revocation_filter
+from app.redis.redis_client import redis, redis_stats
+from redis.exceptions import RedisError
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+# DB 연결 확인 + 커넥션 풀 상태
+@router.get("/db")
+async def db_health():
+    started = time.perf_counter()
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception:
+        raise HTTPException(status_code=503, detail={"status": "unavailable", "pool": pool_stats()})
+    return {
+        "status": "ok",
+        "latency_ms": (time.perf_counter() - started) * 1000,
+        "pool": pool_stats(),
+    }
+
+
+# Redis 연결 확인 + 커넥션 풀/서킷 브레이커 상태
+@router.get("/redis")
+async def redis_health():
+    started = time.perf_counter()
+    try:
+        await redis.ping()
+    except RedisError:
+        raise HTTPException(status_code=503, detail={"status": "unavailable", **redis_stats()})
+    return {
+        "status": "ok",
+        "latency_ms": (time.perf_counter() - started) * 1000,
+        **redis_stats(),
+    }
+
+
+# 비밀번호 해시 풀 상태 (대기열 길이, 해시 지연 시간)
+@router.get("/hashing")
+def hashing_stats():
+    return password_hasher.stats()
+
+
+# 검증된 토큰 캐시 상태
+@router.get("/token-cache")
+def token_cache_stats():
+    return token_cache.stats()
+
+
+# 폐기 토큰 Bloom 필터 상태 (적중/미적중 비율)
+@router.get("/revocation")
+def revocation_filter_stats():
+    return revocation_filter.stats()
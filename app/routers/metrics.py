@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Response
+from app.metrics.metrics import render_metrics, stats_collector
+from app.auth.hashing import password_hasher
+from app.auth.token_cache import token_cache
+from app.auth.revocation_filter import revocation_filter
+from app.db.database import pool_stats
+from app.redis.redis_client import redis_stats
+
+router = APIRouter(tags=["metrics"])
+
+# /health/* 에서 보던 상태 값들을 gauge로도 내보냄
+stats_collector.add_source("password_hasher", password_hasher.stats)
+stats_collector.add_source("token_cache", token_cache.stats)
+stats_collector.add_source("revocation_filter", revocation_filter.stats)
+stats_collector.add_source("db_pool", pool_stats)
+stats_collector.add_source("redis", redis_stats)
+
+
+# Prometheus 수집 엔드포인트
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -1,9 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import orjson
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import insert, select
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncSession
 import app.db.models as models
-from app.db.schemas import PostCreate
+from app.db.post_search import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    is_missing_search_index,
+    search_statement,
+)
+from app.db.schemas import PostCreate, PostListItem, PostOut, PostSearchResult, UserSnapshot
 from app.auth.dependencies import get_current_user
-from app.db.database import get_db
+from app.db.database import get_db, SessionLocal
+from app.redis.content_version import POSTS_SCOPE, bump_version, conditional_headers
+
+# 목록 조회 시 고를 수 있는 컬럼
+POST_FIELDS = ("id", "title", "content", "owner_id")
+POSTS_PAGE_DEFAULT = 50
+POSTS_PAGE_MAX = 200
+# POST /posts/batch 한 번에 받을 수 있는 글 수
+POSTS_BATCH_MAX = 500
+POSTS_SEARCH_DEFAULT = 20
+POSTS_SEARCH_MAX = 100
+# 스트리밍 시 서버 측 커서에서 한 번에 가져오는 행 수
+POSTS_STREAM_BATCH = 500
 
 router = APIRouter(
     prefix="/posts",
@@ -12,27 +35,142 @@ router = APIRouter(
 )
 
 
-@router.post("", status_code=201)
-def create_post(
+@router.post("", status_code=201, response_model=PostOut)
+async def create_post(
     post: PostCreate,
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    new_post = models.Post(
-        title=post.title,
-        content=post.content,
-        owner_id=current_user.id
+    # INSERT ... RETURNING으로 만든 행을 바로 받음 (refresh용 SELECT 없음)
+    result = await db.execute(
+        insert(models.Post)
+        .values(title=post.title, content=post.content, owner_id=current_user.id)
+        .returning(models.Post)
     )
-    db.add(new_post)
-    db.commit()
-    db.refresh(new_post)
+    new_post = result.scalars().one()
+    await db.commit()
+    await bump_version(current_user.id, POSTS_SCOPE)
     return new_post
 
 
-@router.get("/mine")
-def read_my_posts(
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+# 여러 글을 한 트랜잭션으로 저장 (오프라인에서 쓴 초안 동기화용)
+# 응답: 요청 순서대로 {"index": i, "id": 새 글 id}를 한 줄씩 (NDJSON)
+@router.post("/batch", status_code=201)
+async def create_posts_batch(
+    posts: list[PostCreate] = Body(..., min_length=1, max_length=POSTS_BATCH_MAX),
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    rows = [{"title": p.title, "content": p.content, "owner_id": current_user.id} for p in posts]
+    # executemany + RETURNING (insertmanyvalues) → 여러 행을 몇 개의 INSERT 문으로 묶어서 보냄
+    result = await db.execute(
+        insert(models.Post).returning(models.Post.id, sort_by_parameter_order=True), rows
+    )
+    ids = result.scalars().all()
+    await db.commit()
+    await bump_version(current_user.id, POSTS_SCOPE)
+    return StreamingResponse(
+        stream_created_ids(ids), status_code=201, media_type="application/x-ndjson"
+    )
+
+
+async def stream_created_ids(ids):
+    for index, post_id in enumerate(ids):
+        yield orjson.dumps({"index": index, "id": post_id}) + b"\n"
+
+
+def parse_fields(fields: str | None) -> list[str]:
+    if not fields:
+        return list(POST_FIELDS)
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in POST_FIELDS]
+    if unknown or not selected:
+        raise HTTPException(status_code=400, detail=f"지원하지 않는 필드: {', '.join(unknown)}")
+    # 다음 페이지 커서를 만들려면 id가 항상 필요
+    if "id" not in selected:
+        selected.insert(0, "id")
+    return selected
+
+
+# 내 글 목록 (id 기준 keyset 페이지네이션, 최신 글부터)
+#   cursor: 이전 페이지 응답의 X-Next-Cursor 값 (이 id보다 작은 글부터)
+#   fields: "id,title"처럼 필요한 컬럼만 (content를 빼면 훨씬 가벼움)
+#   format=ndjson: 페이지 없이 서버 측 커서로 한 줄씩 스트리밍
+# 응답에 ETag(글 버전 + 쿼리스트링)를 붙이고, If-None-Match가 같으면 DB 조회 없이 304
+@router.get("/mine", response_model=list[PostListItem])
+async def read_my_posts(
+    request: Request,
+    cursor: int | None = Query(None, ge=1, le=models.MAX_POST_ID),
+    limit: int = Query(POSTS_PAGE_DEFAULT, ge=1, le=POSTS_PAGE_MAX),
+    fields: str | None = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
-    posts = db.query(models.Post).filter(models.Post.owner_id == current_user.id).all()
-    return posts
+    columns = parse_fields(fields)
+    headers, not_modified = await conditional_headers(
+        current_user.id, POSTS_SCOPE, request.headers.get("if-none-match"), request.url.query
+    )
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+
+    stmt = (
+        select(*[getattr(models.Post, c) for c in columns])
+        .where(models.Post.owner_id == current_user.id)
+        .order_by(models.Post.id.desc())
+    )
+    if cursor is not None:
+        stmt = stmt.where(models.Post.id < cursor)
+
+    if format == "ndjson":
+        return StreamingResponse(stream_posts(stmt), media_type="application/x-ndjson", headers=headers)
+
+    result = await db.execute(stmt.limit(limit))
+    posts = [dict(row._mapping) for row in result]
+    if len(posts) == limit:
+        headers["X-Next-Cursor"] = str(posts[-1]["id"])
+    # 컬럼 타입이 이미 PostListItem과 같으므로 response_model 검증/jsonable_encoder를 건너뛰고 바로 직렬화
+    # (response_model은 문서용)
+    return ORJSONResponse(posts, headers=headers)
+
+
+async def stream_posts(stmt):
+    # 의존성(get_db)의 세션은 응답을 보내기 전에 닫히므로 스트리밍용 세션을 따로 엶
+    async with SessionLocal() as session:
+        result = await session.stream(stmt.execution_options(yield_per=POSTS_STREAM_BATCH))
+        async for row in result:
+            yield orjson.dumps(dict(row._mapping)) + b"\n"
+
+
+# 내 글 전문 검색 (관련도 높은 순, 같으면 최신 글부터)
+#   q: 검색어 (Postgres에서는 "구문 검색", -제외, or 지원)
+#   cursor: 이전 페이지 응답의 X-Next-Cursor 값
+@router.get("/search", response_model=list[PostSearchResult])
+async def search_my_posts(
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: str | None = None,
+    limit: int = Query(POSTS_SEARCH_DEFAULT, ge=1, le=POSTS_SEARCH_MAX),
+    current_user: UserSnapshot = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="cursor 형식이 올바르지 않습니다.")
+
+    stmt = search_statement(db.bind.dialect.name, current_user.id, q, limit, after)
+    if stmt is None:
+        return ORJSONResponse([])
+
+    try:
+        result = await db.execute(stmt)
+    except (OperationalError, ProgrammingError) as exc:
+        if not is_missing_search_index(exc):
+            raise
+        raise HTTPException(status_code=503, detail="검색 색인이 없습니다. alembic upgrade head를 실행하세요.")
+    posts = [dict(row._mapping) for row in result]
+    headers = None
+    if len(posts) == limit:
+        headers = {"X-Next-Cursor": encode_cursor(posts[-1]["rank"], posts[-1]["id"])}
+    # /posts/mine과 같이 response_model 검증 없이 바로 직렬화
+    return ORJSONResponse(posts, headers=headers)
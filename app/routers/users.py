@@ -1,25 +1,33 @@
 from fastapi import APIRouter, Depends, HTTPException, Response,Request
-import requests
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
-import app.db.models as models
-from app.db.schemas import UserCreate, UserOut, UserLogin, TokenOut
-from app.db.crud import create_user, get_user_by_email, verify_password
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.schemas import UserCreate, UserOut, UserLogin, TokenOut, UserSnapshot
+from app.db.crud import create_user, create_user_if_absent, get_login_record_by_email, get_user_record_by_email
 from app.auth.auth import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES,create_refresh_token,REFRESH_TOKEN_EXPIRE_DAYS
+from app.auth.token_codec import access_codec, refresh_codec, InvalidToken
+from app.auth.auth_utils import consume_token, revoke_tokens
+from app.redis import session_store
+from app.redis.content_version import USER_SCOPE, conditional_headers
 from app.auth.dependencies import verify_token, get_current_user
+from app.auth.hashing import password_hasher
+from app.auth.rate_limit import login_rate_limit, register_rate_limit, refresh_rate_limit
+from app.auth.oauth_client import (
+    provider_get,
+    provider_post,
+    OAuthProviderUnavailable,
+    KAKAO_TOKEN_URL,
+    KAKAO_USERINFO_URL,
+    GOOGLE_TOKEN_URL,
+    GOOGLE_USERINFO_URL,
+)
 from app.db.database import get_db
-#import jwt
 from datetime import timedelta
 from dotenv import load_dotenv
 import os
-from jose import JWTError, jwt
 
 
 
 load_dotenv()  # 이거 꼭 해줘야 함
-REFRESH_SECRET_KEY = os.getenv("REFRESH_SECRET_KEY")  # .env 파일에서 리프레시 토큰 키 가져오기
-ALGORITHM = "HS256"
-
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
 GOOGLE_REDIRECT_URI = os.getenv("GOOGLE_REDIRECT_URI")
@@ -31,23 +39,36 @@ KAKAO_REDIRECT_URI = os.getenv("KAKAO_REDIRECT_URI")
 router = APIRouter(prefix="/users", tags=["users"])
 
 
-@router.post("/register", response_model=UserOut)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(models.User).filter(models.User.email == user.email).first()
-    if existing:
+# 로그인마다 새 세션(리프레시 토큰 패밀리)을 만들고 그 세션의 리프레시 토큰을 발급
+async def issue_refresh_token(user_id: int, request: Request) -> str:
+    family_id, jti = await session_store.start_session(user_id, request.headers.get("user-agent"))
+    return create_refresh_token(data={"sub": str(user_id), "fam": family_id, "jti": jti})
+
+
+@router.post("/register", response_model=UserOut, dependencies=[Depends(register_rate_limit)])
+async def register_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
+    hashed_pw = await password_hasher.hash(user.password)
+    # 존재 확인과 INSERT를 따로 하지 않고 ON CONFLICT 한 번으로 처리
+    new_user = await create_user_if_absent(db, email=user.email, hashed_password=hashed_pw, name=user.name)
+    if new_user is None:
         raise HTTPException(status_code=400, detail="이미 가입된 이메일이에요.")
-    new_user = create_user(db, email=user.email, password=user.password, name=user.name)
     return new_user
 
 
-@router.post("/login", response_model=UserOut)
-async def login(user: UserLogin, response: Response, db: Session = Depends(get_db)):
-    db_user = get_user_by_email(db, user.email)
-    if not db_user or not verify_password(user.password, db_user.hashed_password):
+@router.post("/login", response_model=UserOut, dependencies=[Depends(login_rate_limit)])
+async def login(user: UserLogin, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
+    db_user = await get_login_record_by_email(db, user.email)
+    # bcrypt 검증은 이벤트 루프를 막지 않도록 해시 풀에서 실행
+    # 없는 이메일이나 OAuth 전용 계정(hashed_password 없음)도 더미 해시로 같은 비용의 검증을 거침
+    hashed_password = db_user.hashed_password if db_user else None
+    if not await password_hasher.verify_or_dummy(user.password, hashed_password):
         raise HTTPException(status_code=400, detail="이메일 또는 비밀번호가 틀렸습니다.")
+    # 해시 정책(알고리즘/비용)이 바뀌었으면 응답을 막지 않고 백그라운드에서 다시 해시
+    if password_hasher.needs_update(db_user.hashed_password):
+        password_hasher.schedule_rehash(db_user, user.password)
 
     access_token = create_access_token(data={"sub": str(db_user.id)})
-    refresh_token = create_refresh_token(data={"sub": str(db_user.id)})
+    refresh_token = await issue_refresh_token(db_user.id, request)
 
     response.set_cookie(
         key="refresh_token",
@@ -72,23 +93,49 @@ async def login(user: UserLogin, response: Response, db: Session = Depends(get_d
     return db_user  # UserOut로 직렬화됨
 
 
-@router.post("/refresh")
-def refresh_token(request: Request, response: Response, db: Session = Depends(get_db)):
+@router.post("/refresh", dependencies=[Depends(refresh_rate_limit)])
+async def refresh_token(request: Request, response: Response):
     refresh_token = request.cookies.get("refresh_token")
     if not refresh_token:
         raise HTTPException(status_code=401, detail="리프레시 토큰 없음")
 
     try:
-        payload = jwt.decode(refresh_token, REFRESH_SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="리프레시 토큰 유효하지 않음")
-    except JWTError:
+        payload = refresh_codec.decode(refresh_token)
+        user_id: str = payload["sub"]
+    except InvalidToken:
         raise HTTPException(status_code=401, detail="리프레시 토큰 만료 또는 유효하지 않음")
 
+    # 로그아웃(블랙리스트) 확인은 아래 세션 교체/소비 호출이 같은 왕복에서 함
+    family_id = payload.get("fam")
+    if family_id is None:
+        # 세션 저장소 도입 전에 발급된 토큰 → 새 세션으로 옮겨 줌
+        # 예전 토큰은 옮기면서 폐기해서 한 번만 쓸 수 있게 함 (계속 새 세션을 만들지 못하도록)
+        if not await consume_token(refresh_token, payload):
+            raise HTTPException(status_code=401, detail="이미 사용된 리프레시 토큰입니다. 다시 로그인해 주세요.")
+        new_refresh_token = await issue_refresh_token(int(user_id), request)
+    else:
+        # 리프레시 토큰 교체 (원자적으로 한 번의 Redis 호출)
+        result, new_jti = await session_store.rotate_session(user_id, family_id, payload.get("jti"))
+        if result == session_store.REUSED:
+            # 이미 사용된 토큰이 다시 들어옴 → 탈취 의심, 세션 전체가 폐기됨
+            raise HTTPException(status_code=401, detail="이미 사용된 리프레시 토큰입니다. 다시 로그인해 주세요.")
+        if result not in (session_store.ROTATED, session_store.CONCURRENT):
+            raise HTTPException(status_code=401, detail="만료되었거나 로그아웃된 세션입니다.")
+        new_refresh_token = create_refresh_token(data={"sub": str(user_id), "fam": family_id, "jti": new_jti})
+
     # 새 access_token 발급
     new_access_token = create_access_token(data={"sub": str(user_id)})
 
+    response.set_cookie(
+        key="refresh_token",
+        value=new_refresh_token,
+        httponly=True,
+        secure=True,
+        samesite="none",
+        max_age=REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
+        domain=".songyeserver.info",
+    )
+
     # access_token을 HttpOnly 쿠키로 설정
     response.set_cookie(
         key="access_token",
@@ -107,7 +154,22 @@ def refresh_token(request: Request, response: Response, db: Session = Depends(ge
 
 
 @router.post("/logout")
-def logout(response: Response):
+async def logout(request: Request, response: Response):
+    # 쿠키에 있던 토큰들을 남은 수명 동안 블랙리스트에 올림 (두 토큰을 한 번의 Redis 왕복으로)
+    revoked = []
+    for cookie_name, codec in (("access_token", access_codec), ("refresh_token", refresh_codec)):
+        token = request.cookies.get(cookie_name)
+        if not token:
+            continue
+        try:
+            payload = codec.decode(token)
+        except InvalidToken:
+            continue
+        revoked.append((token, payload))
+        if cookie_name == "refresh_token" and payload.get("fam"):
+            await session_store.revoke_session(payload["sub"], payload["fam"])
+    await revoke_tokens(revoked)
+
     cookie_params = {
         "path": "/",
         "domain": ".songyeserver.info",
@@ -120,13 +182,22 @@ def logout(response: Response):
 
     return {"msg": "로그아웃 완료"}
 
+# 폴링용 조건부 GET: If-None-Match가 현재 ETag와 같으면 본문 없이 304
 @router.get("/me")
-def read_users_me(
-    current_user: models.User = Depends(get_current_user)
+async def read_users_me(
+    request: Request,
+    response: Response,
+    current_user: UserSnapshot = Depends(get_current_user)
 ):
     if not current_user:
         raise HTTPException(status_code=401, detail="인증된 사용자가 없습니다")
 
+    headers, not_modified = await conditional_headers(
+        current_user.id, USER_SCOPE, request.headers.get("if-none-match")
+    )
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
     return {
         "id": current_user.id,
         "email": current_user.email,
@@ -136,6 +207,28 @@ def read_users_me(
 
 
 
+# 내 로그인 세션 목록
+@router.get("/sessions")
+async def read_my_sessions(current_user: UserSnapshot = Depends(get_current_user)):
+    return await session_store.list_sessions(current_user.id)
+
+
+# 모든 기기에서 로그아웃 (리프레시 토큰 패밀리 전체 폐기)
+@router.delete("/sessions")
+async def revoke_my_sessions(current_user: UserSnapshot = Depends(get_current_user)):
+    revoked = await session_store.revoke_all_sessions(current_user.id)
+    return {"revoked": revoked}
+
+
+@router.delete("/sessions/{family_id}")
+async def revoke_my_session(family_id: str, current_user: UserSnapshot = Depends(get_current_user)):
+    if not await session_store.revoke_session(current_user.id, family_id):
+        raise HTTPException(status_code=404, detail="세션을 찾을 수 없습니다")
+    return {"revoked": 1}
+
+
+
+
 @router.get("/protected")
 async def protected_route(user_id: str = Depends(verify_token)):
     return {"message": f"안녕하세요, {user_id}님! 인증된 사용자입니다."}
@@ -174,26 +267,32 @@ async def login_google():
 
 # 🔹 카카오 콜백
 @router.get("/oauth/kakao/callback")
-async def kakao_callback(code: str, response: Response, db: Session = Depends(get_db)):
+async def kakao_callback(code: str, request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     # 1. code로 access_token 요청
-    token_url = "https://kauth.kakao.com/oauth/token"
     token_data = {
         "grant_type": "authorization_code",
         "client_id": KAKAO_REST_API_KEY,
         "redirect_uri": KAKAO_REDIRECT_URI,
         "code": code,
     }
-    token_res = requests.post(token_url, data=token_data)
+    try:
+        token_res = await provider_post("kakao", KAKAO_TOKEN_URL, data=token_data)
+    except OAuthProviderUnavailable:
+        raise HTTPException(status_code=502, detail="카카오 서버 응답 없음")
     if token_res.status_code != 200:
         raise HTTPException(status_code=400, detail="카카오 토큰 요청 실패")
     token_json = token_res.json()
     kakao_access_token = token_json["access_token"]
 
     # 2. 유저 정보 가져오기
-    userinfo_res = requests.get(
-        "https://kapi.kakao.com/v2/user/me",
-        headers={"Authorization": f"Bearer {kakao_access_token}"},
-    )
+    try:
+        userinfo_res = await provider_get(
+            "kakao",
+            KAKAO_USERINFO_URL,
+            headers={"Authorization": f"Bearer {kakao_access_token}"},
+        )
+    except OAuthProviderUnavailable:
+        raise HTTPException(status_code=502, detail="카카오 서버 응답 없음")
     if userinfo_res.status_code != 200:
         raise HTTPException(status_code=400, detail="카카오 사용자 정보 가져오기 실패")
 
@@ -203,13 +302,13 @@ async def kakao_callback(code: str, response: Response, db: Session = Depends(ge
     name = kakao_account.get("profile", {}).get("nickname", "카카오유저")
 
     # 3. DB 확인 (없으면 회원가입, 있으면 로그인)
-    db_user = get_user_by_email(db, email)
+    db_user = await get_user_record_by_email(db, email)
     if not db_user:
-        db_user = create_user(db, email=email, password=None, name=name)
+        db_user = await create_user(db, email=email, hashed_password=None, name=name)
 
     # 4. JWT 발급
     access_token = create_access_token(data={"sub": str(db_user.id)})
-    refresh_token = create_refresh_token(data={"sub": str(db_user.id)})
+    refresh_token = await issue_refresh_token(db_user.id, request)
 
     # 5. 쿠키에 저장
     response.set_cookie(
@@ -231,9 +330,8 @@ async def kakao_callback(code: str, response: Response, db: Session = Depends(ge
 from fastapi.responses import RedirectResponse
 
 @router.get("/oauth/google/callback")
-async def google_callback(code: str, db: Session = Depends(get_db)):
+async def google_callback(code: str, request: Request, db: AsyncSession = Depends(get_db)):
     # 1. 받은 code로 access_token 요청
-    token_url = "https://oauth2.googleapis.com/token"
     token_data = {
         "code": code,
         "client_id": GOOGLE_CLIENT_ID,
@@ -241,25 +339,32 @@ async def google_callback(code: str, db: Session = Depends(get_db)):
         "redirect_uri": GOOGLE_REDIRECT_URI,
         "grant_type": "authorization_code",
     }
-    token_res = requests.post(token_url, data=token_data)
+    try:
+        token_res = await provider_post("google", GOOGLE_TOKEN_URL, data=token_data)
+    except OAuthProviderUnavailable:
+        raise HTTPException(status_code=502, detail="구글 서버 응답 없음")
     token_res.raise_for_status()
     token_json = token_res.json()
     google_access_token = token_json["access_token"]
 
     # 2. 구글 유저 정보 가져오기
-    userinfo_res = requests.get(
-        "https://www.googleapis.com/oauth2/v2/userinfo",
-        headers={"Authorization": f"Bearer {google_access_token}"},
-    )
+    try:
+        userinfo_res = await provider_get(
+            "google",
+            GOOGLE_USERINFO_URL,
+            headers={"Authorization": f"Bearer {google_access_token}"},
+        )
+    except OAuthProviderUnavailable:
+        raise HTTPException(status_code=502, detail="구글 서버 응답 없음")
     userinfo_res.raise_for_status()
     userinfo = userinfo_res.json()
     email = userinfo.get("email")
     name = userinfo.get("name", "구글유저")
 
     # 3. DB 확인 (없으면 회원가입)
-    db_user = get_user_by_email(db, email)
+    db_user = await get_user_record_by_email(db, email)
     if not db_user:
-        db_user = create_user(db, email=email, password=None, name=name)
+        db_user = await create_user(db, email=email, hashed_password=None, name=name)
 
 
     print("구글 유저 정보:", db_user.id)
@@ -267,7 +372,7 @@ async def google_callback(code: str, db: Session = Depends(get_db)):
 
     # 4. JWT 토큰 발급
     access_token = create_access_token(data={"sub": str(db_user.id)})
-    refresh_token = create_refresh_token(data={"sub": str(db_user.id)})
+    refresh_token = await issue_refresh_token(db_user.id, request)
     print("refresh_token:", refresh_token)
 
     # 5. RedirectResponse 객체에 쿠키 직접 세팅
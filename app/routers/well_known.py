@@ -0,0 +1,32 @@
+import hashlib
+import json
+import os
+from fastapi import APIRouter, Request, Response
+from app.auth.token_codec import access_codec
+
+router = APIRouter(prefix="/.well-known", tags=["well-known"])
+
+# 다른 서비스가 JWKS를 캐시해도 되는 시간 (키 교체 시 이 시간만큼 여유를 두고 진행)
+JWKS_MAX_AGE_SECONDS = int(os.getenv("JWKS_MAX_AGE_SECONDS", "300"))
+
+
+def _jwks_body() -> bytes:
+    jwks = access_codec.jwks() if access_codec is not None else {"keys": []}
+    return json.dumps(jwks, separators=(",", ":"), sort_keys=True).encode()
+
+
+# 키는 프로세스 시작 시 고정되므로 본문과 ETag를 한 번만 만듦
+JWKS_BODY = _jwks_body()
+JWKS_ETAG = '"' + hashlib.sha256(JWKS_BODY).hexdigest()[:32] + '"'
+
+
+# 액세스 토큰 검증용 공개키 목록
+@router.get("/jwks.json")
+def jwks(request: Request):
+    headers = {
+        "Cache-Control": f"public, max-age={JWKS_MAX_AGE_SECONDS}, stale-while-revalidate=60",
+        "ETag": JWKS_ETAG,
+    }
+    if request.headers.get("if-none-match") == JWKS_ETAG:
+        return Response(status_code=304, headers=headers)
+    return Response(content=JWKS_BODY, media_type="application/json", headers=headers)
@@ -0,0 +1,96 @@
+# JWT 인코딩/디코딩 마이크로벤치마크 (초당 처리 수)
+# app.auth.token_codec의 빠른 경로를 PyJWT(그리고 설치되어 있으면 python-jose)와 비교합니다.
+#
+#   python -m benchmarks.jwt_codec --seconds 2
+
+import argparse
+import json
+import os
+import time
+import uuid
+
+SECRET = "bench-secret-key-with-enough-entropy-0123456789"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="JWT encode/decode ops per second")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time budget per case")
+    return parser.parse_args()
+
+
+def ops_per_second(func, seconds: float) -> int:
+    # 시간 측정 오버헤드를 줄이려고 1000번 단위로 묶어서 돌림
+    done = 0
+    started = time.perf_counter()
+    while True:
+        for _ in range(1000):
+            func()
+        done += 1000
+        elapsed = time.perf_counter() - started
+        if elapsed >= seconds:
+            return int(done / elapsed)
+
+
+def claims() -> dict:
+    return {"sub": "42", "exp": int(time.time()) + 900, "jti": uuid.uuid4().hex}
+
+
+def main():
+    args = parse_args()
+    os.environ.setdefault("SECRET_KEY", SECRET)
+    os.environ.setdefault("REFRESH_SECRET_KEY", SECRET)
+
+    import jwt
+    from app.auth.token_codec import TokenCodec
+
+    codec = TokenCodec.from_secret(SECRET)
+    sample = claims()
+    token = codec.encode(sample)
+
+    results = {
+        "token_codec": {
+            "encode": ops_per_second(lambda: codec.encode(sample), args.seconds),
+            "decode": ops_per_second(lambda: codec.decode(token), args.seconds),
+        },
+        "pyjwt": {
+            "encode": ops_per_second(lambda: jwt.encode(sample, SECRET, algorithm="HS256"), args.seconds),
+            "decode": ops_per_second(lambda: jwt.decode(token, SECRET, algorithms=["HS256"]), args.seconds),
+        },
+    }
+
+    try:
+        from jose import jwt as jose_jwt
+    except ImportError:
+        pass
+    else:
+        results["python_jose"] = {
+            "encode": ops_per_second(lambda: jose_jwt.encode(sample, SECRET, algorithm="HS256"), args.seconds),
+            "decode": ops_per_second(lambda: jose_jwt.decode(token, SECRET, algorithms=["HS256"]), args.seconds),
+        }
+
+    # 비대칭 키도 확인 (cryptography가 있으면)
+    try:
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+    except ImportError:
+        pass
+    else:
+        private = Ed25519PrivateKey.generate()
+        private_pem = private.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        )
+        public_pem = private.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+        ed_codec = TokenCodec({"bench": ("EdDSA", private_pem, public_pem)}, "bench")
+        ed_token = ed_codec.encode(sample)
+        results["token_codec_eddsa"] = {
+            "encode": ops_per_second(lambda: ed_codec.encode(sample), args.seconds),
+            "decode": ops_per_second(lambda: ed_codec.decode(ed_token), args.seconds),
+        }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
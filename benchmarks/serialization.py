@@ -0,0 +1,73 @@
+# /posts/mine 응답 직렬화 비용 벤치마크 (요청당 µs)
+# 같은 글 목록을 세 가지 방식으로 JSON 본문까지 만드는 시간을 비교합니다.
+#   - stdlib: 예전 방식 (jsonable_encoder + 표준 json의 JSONResponse)
+#   - response_model: list[PostListItem] 검증 + orjson (FastAPI가 response_model로 하는 일)
+#   - bypass: 행 dict를 검증 없이 바로 ORJSONResponse (지금 /posts/mine이 하는 일)
+# DB 조회 시간은 빼고 직렬화만 잽니다.
+#
+#   python -m benchmarks.serialization --sizes 50,200,1000
+
+import argparse
+import json
+import time
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="benchmark /posts/mine response serialization")
+    parser.add_argument("--sizes", default="50,200,1000", help="posts per response")
+    parser.add_argument("--content-length", type=int, default=500, help="characters of content per post")
+    parser.add_argument("--seconds", type=float, default=1.0, help="time budget per case")
+    return parser.parse_args()
+
+
+def us_per_call(func, seconds: float) -> float:
+    done = 0
+    started = time.perf_counter()
+    while True:
+        func()
+        done += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= seconds:
+            return round(elapsed / done * 1_000_000, 1)
+
+
+def main():
+    args = parse_args()
+
+    from fastapi.encoders import jsonable_encoder
+    from fastapi.responses import JSONResponse, ORJSONResponse
+    from pydantic import TypeAdapter
+    from app.db.schemas import PostListItem
+
+    adapter = TypeAdapter(list[PostListItem])
+    content = ("가나다라 lorem ipsum " * args.content_length)[:args.content_length]
+
+    def stdlib(rows):
+        return JSONResponse(jsonable_encoder(rows)).body
+
+    def response_model(rows):
+        validated = adapter.validate_python(rows)
+        return ORJSONResponse(adapter.dump_python(validated, mode="json")).body
+
+    def bypass(rows):
+        return ORJSONResponse(rows).body
+
+    results = {}
+    for size in [int(s) for s in args.sizes.split(",")]:
+        rows = [
+            {"id": 1_000_000 - i, "title": f"post {i}", "content": content, "owner_id": 42}
+            for i in range(size)
+        ]
+        assert json.loads(stdlib(rows)) == json.loads(bypass(rows)) == json.loads(response_model(rows))
+        results[str(size)] = {
+            "body_bytes": len(bypass(rows)),
+            "stdlib_us": us_per_call(lambda: stdlib(rows), args.seconds),
+            "response_model_us": us_per_call(lambda: response_model(rows), args.seconds),
+            "bypass_us": us_per_call(lambda: bypass(rows), args.seconds),
+        }
+
+    print(json.dumps({"content_length": args.content_length, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
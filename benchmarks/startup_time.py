@@ -0,0 +1,103 @@
+# main:app import 시간(콜드 스타트) 벤치마크
+# 새 파이썬 프로세스에서 `import main`에 걸리는 시간을 여러 번 재고,
+# -X importtime 결과에서 누적 시간이 큰 모듈을 함께 보여 줍니다. 결과는 JSON으로 출력됩니다.
+#
+#   python -m benchmarks.startup_time --runs 20
+#   python -m benchmarks.startup_time --lifespan   # lifespan(스키마 확인 등)까지 포함 (DB/Redis 필요)
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+IMPORT_SNIPPET = """
+import time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+if {lifespan}:
+    import asyncio
+    async def run():
+        async with main.app.router.lifespan_context(main.app):
+            pass
+    asyncio.run(run())
+print(imported - started, time.perf_counter() - imported)
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="measure the cold import time of main:app")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--lifespan", action="store_true", help="also run the app lifespan startup/shutdown")
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports to report")
+    return parser.parse_args()
+
+
+def run_once(lifespan: bool) -> tuple[float, float]:
+    env = dict(os.environ)
+    # import 시점에 DB에 연결하지 않으므로 URL만 있으면 됨
+    env.setdefault("DATABASE_URL", "sqlite:///bench_startup.db")
+    env.setdefault("REDIS_URL", "redis://localhost:6379/0")
+    out = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET.format(lifespan=lifespan)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout.split()
+    return float(out[0]), float(out[1])
+
+
+def slowest_imports(top: int) -> list[dict]:
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///bench_startup.db")
+    env.setdefault("REDIS_URL", "redis://localhost:6379/0")
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:   self [us] | cumulative | module"
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+        })
+    rows.sort(key=lambda r: r["cumulative_ms"], reverse=True)
+    return rows[:top]
+
+
+def main():
+    args = parse_args()
+    imports, lifespans = [], []
+    for _ in range(args.runs):
+        import_seconds, lifespan_seconds = run_once(args.lifespan)
+        imports.append(import_seconds * 1000)
+        lifespans.append(lifespan_seconds * 1000)
+
+    report = {
+        "runs": args.runs,
+        "import_ms": {
+            "p50": round(statistics.median(imports), 1),
+            "min": round(min(imports), 1),
+            "max": round(max(imports), 1),
+        },
+        "slowest_imports": slowest_imports(args.top),
+    }
+    if args.lifespan:
+        report["lifespan_ms"] = {
+            "p50": round(statistics.median(lifespans), 1),
+            "min": round(min(lifespans), 1),
+            "max": round(max(lifespans), 1),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# 벤치마크/테스트용 카카오·구글 OAuth 스텁 서버
+# 실제 프로바이더 대신 토큰 교환과 사용자 정보 조회에 고정된 응답을 돌려줍니다.
+# load_test에서는 httpx.ASGITransport로 OAuth HTTP 클라이언트에 바로 연결하고,
+# 단독으로 띄울 때는 `hypercorn benchmarks.stub_oauth:app --bind 127.0.0.1:9100` 처럼 실행합니다.
+
+import asyncio
+import os
+from urllib.parse import parse_qs
+
+from fastapi import FastAPI, Header, HTTPException, Request
+
+# 프로바이더 왕복 시간을 흉내 내는 지연 (초)
+STUB_OAUTH_LATENCY = float(os.getenv("STUB_OAUTH_LATENCY", "0"))
+
+app = FastAPI()
+
+
+async def _simulate_latency():
+    if STUB_OAUTH_LATENCY > 0:
+        await asyncio.sleep(STUB_OAUTH_LATENCY)
+
+
+# python-multipart 없이 x-www-form-urlencoded 본문에서 code만 꺼냄
+async def _form_code(request: Request) -> str:
+    values = parse_qs((await request.body()).decode()).get("code")
+    if not values:
+        raise HTTPException(status_code=400, detail="missing code")
+    return values[0]
+
+
+def _user_from_authorization(authorization: str | None) -> str:
+    if not authorization or not authorization.startswith("Bearer stub-"):
+        raise HTTPException(status_code=401, detail="invalid token")
+    # 토큰 = "stub-<code>", code가 곧 사용자 식별자
+    return authorization[len("Bearer stub-"):]
+
+
+@app.post("/kakao/token")
+async def kakao_token(request: Request):
+    code = await _form_code(request)
+    await _simulate_latency()
+    return {"access_token": f"stub-{code}", "token_type": "bearer", "expires_in": 3600}
+
+
+@app.get("/kakao/me")
+async def kakao_me(authorization: str | None = Header(None)):
+    await _simulate_latency()
+    user = _user_from_authorization(authorization)
+    return {
+        "id": user,
+        "kakao_account": {
+            "email": f"kakao-{user}@stub.local",
+            "profile": {"nickname": f"kakao {user}"},
+        },
+    }
+
+
+@app.post("/google/token")
+async def google_token(request: Request):
+    code = await _form_code(request)
+    await _simulate_latency()
+    return {"access_token": f"stub-{code}", "token_type": "Bearer", "expires_in": 3600}
+
+
+@app.get("/google/userinfo")
+async def google_userinfo(authorization: str | None = Header(None)):
+    await _simulate_latency()
+    user = _user_from_authorization(authorization)
+    return {"email": f"google-{user}@stub.local", "name": f"google {user}"}
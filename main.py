@@ -1,13 +1,47 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from redis.exceptions import RedisError
 from app.db.database import engine
-from app.db.models import Base
-from app.routers import users, posts
+from app.db.schema_check import check_schema_revision
+from app.auth.hashing import password_hasher
+from app.auth.password_policy import apply_password_policy
+from app.auth.oauth_client import close_http_client
+from app.auth.revocation_filter import revocation_filter
+from app.redis.redis_client import REDIS_BREAKER_RESET_SECONDS, close_redis, start_redis
+from app.routers import users, posts, health, well_known, metrics, admin
+from app.metrics.middleware import MetricsMiddleware
 
-app = FastAPI()
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 테이블 생성은 alembic이 담당하고, 여기서는 리비전만 비교
+    await check_schema_revision()
+    await apply_password_policy()
+    await start_redis()
+    revocation_filter.start()
+    yield
+    await revocation_filter.stop()
+    await close_redis()
+    await close_http_client()
+    password_hasher.shutdown()
+    await engine.dispose()
+
+
+# 응답 직렬화는 orjson (표준 json보다 훨씬 빠름)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+
+# 대체 경로가 없는 Redis 호출(폐기 확인, 세션 교체 등)이 실패하면 500 대신 503
+# 서킷 브레이커가 열려 있으면 타임아웃을 기다리지 않고 바로 여기로 옴
+@app.exception_handler(RedisError)
+async def redis_unavailable(request: Request, exc: RedisError):
+    return ORJSONResponse(
+        status_code=503,
+        content={"detail": "일시적으로 서비스를 사용할 수 없습니다. 잠시 후 다시 시도해 주세요."},
+        headers={"Retry-After": str(int(REDIS_BREAKER_RESET_SECONDS) or 1)},
+    )
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,7 +49,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Retry-After"],
 )
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(users.router)
 app.include_router(posts.router)
+app.include_router(health.router)
+app.include_router(well_known.router)
+app.include_router(metrics.router)
+app.include_router(admin.router)
@@ -0,0 +1,77 @@
+# 세션 도입 전 리프레시 토큰(fam/jti 없음)은 한 번만 쓸 수 있어야 함
+# 서명의 base64 표기만 바꾼 같은 토큰('=' 패딩 추가 등)으로 다시 옮겨 갈 수 없는지 확인하는 회귀 테스트
+# SQLite 임시 DB(alembic upgrade head) + fakeredis로 앱을 띄워서 POST /users/refresh를 직접 호출합니다.
+#
+#   python -m pytest -q tests
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+_db_dir = tempfile.mkdtemp()
+# 앱 모듈은 import 시점에 환경변수를 읽으므로 먼저 채움
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{_db_dir}/refresh_replay.db",
+    "REDIS_URL": "redis://localhost:6379/15",
+    "SECRET_KEY": "test-access-secret",
+    "REFRESH_SECRET_KEY": "test-refresh-secret",
+    "SCHEMA_CHECK": "off",
+})
+
+BASE_URL = "https://test.songyeserver.info"  # 쿠키 도메인(.songyeserver.info)과 맞춤
+
+
+def _prepare():
+    from alembic import command
+    from alembic.config import Config
+    import fakeredis
+    import app.redis.redis_client as redis_client
+
+    command.upgrade(Config(str(ROOT / "alembic.ini")), "head")
+    fake_pool = fakeredis.FakeAsyncRedis(decode_responses=True).connection_pool
+    redis_client.redis = redis_client.ManagedRedis(connection_pool=fake_pool)
+
+
+_prepare()
+
+
+async def _refresh_statuses(tokens: list[str]) -> list[int]:
+    import httpx
+    from main import app
+
+    statuses = []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        for token in tokens:
+            async with httpx.AsyncClient(transport=transport, base_url=BASE_URL) as client:
+                client.cookies.set("refresh_token", token, domain=".songyeserver.info")
+                statuses.append((await client.post("/users/refresh")).status_code)
+    return statuses
+
+
+def test_legacy_refresh_token_cannot_be_replayed_with_padded_signature():
+    from app.auth.token_codec import refresh_codec
+
+    legacy = refresh_codec.encode({"sub": "1", "exp": time.time() + 600})
+    variants = [legacy, legacy, legacy + "=", legacy + "==", legacy + "=$"]
+    assert asyncio.run(_refresh_statuses(variants)) == [200, 401, 401, 401, 401]
+
+
+def test_consume_key_ignores_signature_encoding():
+    from app.auth.auth_utils import consume_token
+    from app.auth.token_codec import refresh_codec
+
+    legacy = refresh_codec.encode({"sub": "2", "exp": time.time() + 600})
+    payload = refresh_codec.decode(legacy)
+
+    async def consume_all():
+        return [await consume_token(token, payload) for token in (legacy + "==", legacy, legacy + "=")]
+
+    # 표기가 달라도 같은 토큰이므로 처음 한 번만 통과
+    assert asyncio.run(consume_all()) == [True, False, False]